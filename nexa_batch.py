@@ -0,0 +1,193 @@
+import argparse
+import importlib
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# name -> (module, class) of every NEXA version with a process_command()
+VARIANTS = {
+    "real_voice": ("nexa_real_voice_311", "NEXA_Real_Voice"),
+    "proper": ("nexa_jarvis", "NEXA_Proper"),
+    "voice_input": ("nexa_voice_input", "NEXA_Voice_Input"),
+    "no_pyaudio": ("nexa_no_pyaudio", "NEXA_No_PyAudio"),
+    "perfected": ("nexa_final_perfected", "NEXA_Final"),
+    "final_voice": ("nexa_final_voice", "NEXA_Final"),
+    "female": ("nexa_female_voice", "NEXA_Female_Voice"),
+}
+
+
+def make_assistant(variant):
+    """A NEXA instance that needs no microphone, speakers or network"""
+    module_name, class_name = VARIANTS[variant]
+    cls = getattr(importlib.import_module(module_name), class_name)
+    if variant == "real_voice":
+        from nexa_capture import SyntheticSource
+        return cls(audio_source=SyntheticSource(segments=[(0.1, 0)]))
+    return cls()
+
+
+def run_command(assistant, line_number, command):
+    """One JSONL result record for one command"""
+    record = {"line": line_number, "command": command}
+    start = time.perf_counter()
+    try:
+        result = assistant.process_command(command)
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    else:
+        # nexa_real_voice_311 answers with (response, tone)
+        if isinstance(result, tuple):
+            record["response"], record["tone"] = result[0], result[1]
+        else:
+            record["response"] = result
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+
+# Each worker process builds its own assistant once
+_assistant = None
+
+
+def _init_worker(variant, data_dir):
+    """Give this process its own scratch data directory and a quiet assistant"""
+    global _assistant
+    os.environ.setdefault("NEXA_TTS_BACKEND", "wav")
+    os.environ.setdefault("NEXA_SPEECH_CACHE", "0")
+    # Reminders, alarms and saved settings land here instead of the real files
+    os.chdir(tempfile.mkdtemp(prefix="worker_", dir=data_dir))
+    # The assistants print as they work; only the JSONL output should be seen
+    sys.stdout = open(os.devnull, "w", encoding="utf-8")
+    _assistant = make_assistant(variant)
+
+
+def _process_chunk(chunk):
+    return [run_command(_assistant, number, command) for number, command in chunk]
+
+
+def read_chunks(lines, chunk_size):
+    """Lists of (line number, command), skipping blank lines, read lazily"""
+    numbered = ((number, line.strip()) for number, line in enumerate(lines, 1))
+    numbered = ((number, line) for number, line in numbered if line)
+    while True:
+        chunk = list(itertools.islice(numbered, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BatchRunner:
+    """Streams commands through process_command and writes one JSON line per command
+
+    Input is read a chunk at a time and at most in_flight chunks are queued
+    or running, so memory stays flat however long the input is. Results are
+    written in input order. With workers=0 everything runs in this process.
+    Each worker has its own assistant, so commands that depend on earlier
+    ones (like "my name is ..." then "hello") only carry over within one
+    worker; use workers=0 to replay a conversation.
+    """
+
+    def __init__(self, variant, workers=None, chunk_size=256, in_flight=None):
+        if variant not in VARIANTS:
+            raise ValueError(f"unknown NEXA variant '{variant}', pick one of {', '.join(VARIANTS)}")
+        self.variant = variant
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+        self.in_flight = in_flight or max(2, self.workers * 2)
+        self.count = 0
+        self.errors = 0
+        self.durations = []
+
+    def _write(self, records, out):
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.count += 1
+            if "error" in record:
+                self.errors += 1
+            # Bounded sample of timings for the summary
+            if len(self.durations) < 100000:
+                self.durations.append(record["seconds"])
+
+    def _run_local(self, chunks, out, data_dir):
+        real_stdout = sys.stdout
+        cwd = os.getcwd()
+        try:
+            _init_worker(self.variant, data_dir)
+            for chunk in chunks:
+                self._write(_process_chunk(chunk), out)
+        finally:
+            sys.stdout = real_stdout
+            os.chdir(cwd)
+
+    def _run_pool(self, chunks, out, data_dir):
+        pending = deque()
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.variant, data_dir)) as pool:
+            for chunk in chunks:
+                if len(pending) >= self.in_flight:
+                    self._write(pending.popleft().result(), out)
+                pending.append(pool.submit(_process_chunk, chunk))
+            while pending:
+                self._write(pending.popleft().result(), out)
+
+    def run(self, lines, out):
+        """Process every command in lines (any iterable of text lines); returns a summary"""
+        start = time.perf_counter()
+        chunks = read_chunks(lines, self.chunk_size)
+        with tempfile.TemporaryDirectory(prefix="nexa_batch_") as data_dir:
+            if self.workers == 0:
+                self._run_local(chunks, out, data_dir)
+            else:
+                self._run_pool(chunks, out, data_dir)
+        out.flush()
+        return self.summary(time.perf_counter() - start)
+
+    def summary(self, elapsed):
+        durations = sorted(self.durations)
+        summary = {
+            "commands": self.count,
+            "errors": self.errors,
+            "seconds": elapsed,
+            "per_second": self.count / elapsed if elapsed else 0.0,
+        }
+        if durations:
+            summary["p50"] = durations[len(durations) // 2]
+            summary["p95"] = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+            summary["max"] = durations[-1]
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run NEXA commands from a file or stdin and write JSONL results")
+    parser.add_argument("input", nargs="?", default="-", help="command file, one per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file ('-' for stdout)")
+    parser.add_argument("--variant", default="real_voice", choices=sorted(VARIANTS))
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU, 0 runs in this process)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="commands sent to a worker at a time")
+    args = parser.parse_args()
+
+    runner = BatchRunner(args.variant, args.workers, args.chunk_size)
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        summary = runner.run(source, out)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"✅ {summary['commands']} commands in {summary['seconds']:.2f}s "
+          f"({summary['per_second']:.0f}/s), {summary['errors']} errors", file=sys.stderr)
+    if "p50" in summary:
+        print(f"⏱️ per command: p50 {summary['p50'] * 1000:.3f} ms, p95 {summary['p95'] * 1000:.3f} ms, "
+              f"max {summary['max'] * 1000:.3f} ms", file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,247 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import wave
+
+from nexa_capture import SyntheticSource, WavFileSource
+from nexa_intents import REAL_VOICE_MATCHER
+from nexa_recognition import LocalTranscriptBackend
+
+BASELINE_VERSION = 2
+STAGES = ("capture", "recognition", "intent", "speech", "total")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nexa_benchmark_baseline.json")
+
+# What the generated fixture "says", one utterance per line
+DEFAULT_COMMANDS = [
+    "hello there",
+    "my name is alex",
+    "what time is it",
+    "what is the date today",
+    "what day is it",
+    "tell me a joke",
+    "how is the weather",
+    "how are you doing",
+    "thank you so much",
+    "you are amazing",
+    "who are you",
+    "what can you do",
+    "set a reminder",
+    "play some music",
+    "goodbye",
+]
+
+
+def write_fixture(directory, commands=DEFAULT_COMMANDS, sample_rate=16000):
+    """session.wav plus transcript.txt: a tone burst per command, separated by silence
+
+    A recorded session can be dropped in with the same two file names instead.
+    """
+    os.makedirs(directory, exist_ok=True)
+    # Leading silence gives the noise tracker a floor before the first phrase
+    segments = [(1.5, 0)]
+    for command in commands:
+        segments += [(max(0.6, 0.3 * len(command.split())), 4000), (1.2, 0)]
+    source = SyntheticSource(segments, sample_rate=sample_rate)
+    source.open()
+    with wave.open(os.path.join(directory, "session.wav"), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(source.data)
+    with open(os.path.join(directory, "transcript.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(commands) + "\n")
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(values):
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+    }
+
+
+@contextlib.contextmanager
+def quiet_assistant(**options):
+    """A ready NEXA_Real_Voice built from options, closed again on exit
+
+    Speech goes nowhere and nothing is cached, so only NEXA's own work is timed.
+    """
+    os.environ.setdefault("NEXA_TTS_BACKEND", "null")
+    os.environ.setdefault("NEXA_SPEECH_CACHE", "0")
+    from nexa_real_voice_311 import NEXA_Real_Voice
+    nexa = NEXA_Real_Voice(**options)
+    nexa.wait_until_ready()
+    try:
+        yield nexa
+    finally:
+        nexa.audio_capture.close()
+        nexa.recognition.close()
+
+
+def run_session(fixture_dir, work_dir):
+    """One pass over the fixture through listen -> process_command -> speak"""
+    turns = []
+    with quiet_assistant(
+        audio_source=WavFileSource(os.path.join(fixture_dir, "session.wav")),
+        # Whole clips through the recognition pool, as with the live recognizer
+        recognizer_backend=LocalTranscriptBackend(os.path.join(fixture_dir, "transcript.txt"), streaming=False),
+        state_path=os.path.join(work_dir, "state.json"),
+    ) as nexa:
+        while True:
+            start = time.perf_counter()
+            audio = nexa.capture()
+            captured = time.perf_counter()
+            if audio is None:
+                break
+            command = nexa.recognize(audio)
+            recognized = time.perf_counter()
+            response, tone = nexa.process_command(command)
+            answered = time.perf_counter()
+            nexa.speak(response, tone)
+            spoken = time.perf_counter()
+            turns.append({
+                "intent": (REAL_VOICE_MATCHER.match(command) if command else None) or "unknown",
+                "capture": captured - start,
+                "recognition": recognized - captured,
+                "intent_seconds": answered - recognized,
+                "speech": spoken - answered,
+                "total": spoken - start,
+            })
+    return turns
+
+
+def calibration_seconds(rounds=5):
+    """Best time of a fixed pure-Python workload: this machine's unit of speed"""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        total = 0
+        for i in range(200000):
+            total += i * i % 7
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(fixture_dir, repeat=3):
+    turns = []
+    calibration = calibration_seconds()
+    with tempfile.TemporaryDirectory(prefix="nexa_bench_") as work_dir:
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                turns += run_session(fixture_dir, work_dir)
+    calibration = min(calibration, calibration_seconds())
+    report = {"turns": len(turns), "calibration": calibration, "stages": {}, "intents": {}}
+    for stage in STAGES:
+        key = "intent_seconds" if stage == "intent" else stage
+        report["stages"][stage] = summarize([turn[key] for turn in turns])
+    for intent in sorted({turn["intent"] for turn in turns}):
+        report["intents"][intent] = summarize([turn["total"] for turn in turns if turn["intent"] == intent])
+    return report
+
+
+def relative(report):
+    """Baseline form of a report: every p95 in units of its calibration time
+
+    Seconds only mean something on the machine that measured them; a p95
+    of 3 calibrations is the same budget on a fast laptop and a slow CI box.
+    """
+    unit = report["calibration"]
+    baseline = {"version": BASELINE_VERSION, "stages": {}, "intents": {}}
+    for group in ("stages", "intents"):
+        for name, stats in report[group].items():
+            baseline[group][name] = {"p95": stats["p95"] / unit}
+    return baseline
+
+
+def compare(report, baseline, tolerance=0.5, slack=0.005):
+    """Regressions as text lines: p95 more than tolerance over the baseline's budget, plus slack seconds
+
+    The baseline holds p95s in calibration units (see relative()); they
+    become this machine's budgets by scaling with this run's calibration.
+    """
+    if baseline.get("version") != BASELINE_VERSION:
+        return [f"baseline version {baseline.get('version')} is not {BASELINE_VERSION} - run with --save-baseline"]
+    unit = report["calibration"]
+    problems = []
+    for group in ("stages", "intents"):
+        for name, old in baseline.get(group, {}).items():
+            new = report[group].get(name)
+            if new is None:
+                continue
+            budget = old["p95"] * unit
+            limit = budget * (1 + tolerance) + slack
+            if new["p95"] > limit:
+                problems.append(f"{group[:-1]} '{name}': p95 {new['p95'] * 1000:.1f} ms "
+                                f"vs budget {budget * 1000:.1f} ms here (limit {limit * 1000:.1f} ms)")
+    return problems
+
+
+def print_report(report):
+    print(f"📊 {report['turns']} turns (calibration {report['calibration'] * 1000:.2f} ms)")
+    print(f"   {'stage':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, stats in report["stages"].items():
+        print(f"   {stage:<14}{stats['p50'] * 1000:>10.2f}{stats['p95'] * 1000:>10.2f}{stats['p99'] * 1000:>10.2f}")
+    print(f"   {'intent':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  (whole turn)")
+    for intent, stats in report["intents"].items():
+        print(f"   {intent:<14}{stats['p50'] * 1000:>10.2f}{stats['p95'] * 1000:>10.2f}{stats['p99'] * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end latency benchmark for NEXA_Real_Voice")
+    parser.add_argument("--fixtures", help="directory with session.wav and transcript.txt (generated if omitted)")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the fixture")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p95 growth over baseline (0.5 = +50%%)")
+    parser.add_argument("--json", help="also write the full report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="nexa_fixture_") as generated:
+        fixture_dir = args.fixtures
+        if not fixture_dir:
+            write_fixture(generated)
+            fixture_dir = generated
+        report = run_benchmark(fixture_dir, args.repeat)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(relative(report), f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("ℹ️ No baseline yet - run with --save-baseline to create one")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    problems = compare(report, baseline, args.tolerance)
+    if problems:
+        print("🚨 PERFORMANCE REGRESSION")
+        for problem in problems:
+            print(f"   ❌ {problem}")
+        return 1
+    print("✅ No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,367 @@
+import threading
+import array
+import math
+import wave
+import time
+import os
+from nexa_metrics import METRICS
+
+
+class MicrophoneSource:
+    """Default microphone, opened once through speech_recognition and left open"""
+
+    live = True
+
+    def __init__(self, device_index=None):
+        self.device_index = device_index
+        self.mic = None
+
+    def open(self):
+        import speech_recognition as sr
+        self.mic = sr.Microphone(device_index=self.device_index)
+        self.mic.__enter__()
+        self.sample_rate = self.mic.SAMPLE_RATE
+        self.sample_width = self.mic.SAMPLE_WIDTH
+        self.chunk = self.mic.CHUNK
+
+    def read(self):
+        return self.mic.stream.read(self.chunk)
+
+    def close(self):
+        if self.mic:
+            self.mic.__exit__(None, None, None)
+            self.mic = None
+
+
+class WavFileSource:
+    """Mono 16-bit WAV file played into the capture path, for headless runs"""
+
+    def __init__(self, path, chunk=1024, realtime=False):
+        self.path = path
+        self.chunk = chunk
+        self.realtime = realtime
+        self.live = realtime
+        self.wav = None
+
+    def open(self):
+        self.wav = wave.open(self.path, 'rb')
+        if self.wav.getnchannels() != 1 or self.wav.getsampwidth() != 2:
+            raise ValueError(f"{self.path}: only mono 16-bit WAV files are supported")
+        self.sample_rate = self.wav.getframerate()
+        self.sample_width = 2
+
+    def read(self):
+        frame = self.wav.readframes(self.chunk)
+        if not frame:
+            return None
+        if self.realtime:
+            time.sleep(self.chunk / self.sample_rate)
+        return frame
+
+    def close(self):
+        if self.wav:
+            self.wav.close()
+            self.wav = None
+
+
+class SyntheticSource:
+    """Generated audio: (seconds, amplitude) segments of a 220 Hz tone, 0 for silence"""
+
+    def __init__(self, segments=None, sample_rate=16000, chunk=1024, realtime=False):
+        self.segments = segments or [(1.0, 0), (1.2, 4000), (1.0, 0)]
+        self.sample_rate = sample_rate
+        self.sample_width = 2
+        self.chunk = chunk
+        self.realtime = realtime
+        self.live = realtime
+
+    def open(self):
+        samples = array.array('h')
+        step = 2 * math.pi * 220 / self.sample_rate
+        for seconds, amplitude in self.segments:
+            length = int(seconds * self.sample_rate)
+            samples.extend(int(amplitude * math.sin(step * i)) for i in range(length))
+        self.data = samples.tobytes()
+        self.position = 0
+
+    def read(self):
+        size = self.chunk * self.sample_width
+        frame = self.data[self.position:self.position + size]
+        if not frame:
+            return None
+        self.position += size
+        if self.realtime:
+            time.sleep(self.chunk / self.sample_rate)
+        return frame
+
+    def close(self):
+        pass
+
+
+def open_audio_source(spec=None):
+    """Audio source from a spec: "mic" (default), "wav:<path>" or "synthetic"
+
+    NEXA_AUDIO_SOURCE supplies the spec when none is given.
+    """
+    spec = spec or os.environ.get("NEXA_AUDIO_SOURCE", "mic")
+    if spec.startswith("wav:"):
+        return WavFileSource(spec[4:], realtime=True)
+    if spec == "synthetic":
+        return SyntheticSource(realtime=True)
+    return MicrophoneSource()
+
+
+class RingBuffer:
+    """Fixed-size store of the most recent audio frames, addressed by frame number"""
+
+    def __init__(self, frame_bytes, capacity):
+        self.frame_bytes = frame_bytes
+        self.capacity = capacity
+        self.buffer = bytearray(frame_bytes * capacity)
+        self.total = 0  # frames written since the stream opened
+
+    def write(self, frame):
+        if len(frame) != self.frame_bytes:
+            frame = frame[:self.frame_bytes].ljust(self.frame_bytes, b'\0')
+        start = (self.total % self.capacity) * self.frame_bytes
+        self.buffer[start:start + self.frame_bytes] = frame
+        self.total += 1
+
+    def oldest(self):
+        return max(0, self.total - self.capacity)
+
+    def read(self, first, last):
+        """Frames first..last-1 as one bytes object; they must still be in the buffer"""
+        chunks = []
+        for index in range(first, last):
+            start = (index % self.capacity) * self.frame_bytes
+            chunks.append(self.buffer[start:start + self.frame_bytes])
+        return b''.join(chunks)
+
+
+class Utterance:
+    def __init__(self, frame_data, sample_rate, sample_width, start_frame, end_frame):
+        self.frame_data = frame_data
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        # Filled in by a streaming recognizer while the phrase was captured
+        self.transcript = None
+        # How closely the wake word matched, when a wake-word gate let it through
+        self.wake_score = None
+
+    def duration(self):
+        return len(self.frame_data) / (self.sample_rate * self.sample_width)
+
+
+class AudioCapture:
+    """One input stream kept open for the session, feeding a ring buffer
+
+    A reader thread copies every frame into the ring; next_utterance() cuts
+    phrases out of it with pre-roll, so the onset of speech that began just
+    before listening started is kept.
+
+    Speech is detected per 10 ms analysis frame (nexa_vad), so a phrase ends
+    pause_threshold after the last spoken frame rather than after whole
+    silent chunks, and leading and trailing silence is trimmed off before
+    the audio goes to the recognizer. With adaptive on, the reader thread
+    also keeps energy_threshold in step with the room's noise floor, from
+    the same stream, so no separate calibration pass is needed. (For
+    sources that are not live the listener does it instead, as it reaches
+    each frame, since the reader may be far ahead of it.)
+
+    Live sources (the microphone) are read at their own pace and listening
+    starts from "now". Sources that are not live, such as a WAV file read as
+    fast as possible, are consumed in order and the reader waits rather than
+    overwrite frames nobody has looked at yet.
+    """
+
+    def __init__(self, source, buffer_seconds=30, energy_threshold=300,
+                 pause_threshold=0.5, pre_roll=0.5, tail=0.15, adaptive=True, noise_ratio=3.0):
+        self.source = source
+        self.buffer_seconds = buffer_seconds
+        self.energy_threshold = energy_threshold
+        self.pause_threshold = pause_threshold
+        self.pre_roll = pre_roll
+        self.tail = tail
+        self.adaptive = adaptive
+        self.noise_ratio = noise_ratio
+        self.noise = None
+        self.ring = None
+        self.cursor = 0
+        self.overruns = 0
+        self.draining = False  # a phrase was cut early; skip the rest of it
+        self.ended = False
+        self.running = False
+        self.thread = None
+        self.condition = threading.Condition()
+
+    def start(self):
+        self.source.open()
+        self.sample_rate = self.source.sample_rate
+        self.sample_width = self.source.sample_width
+        self.chunk = self.source.chunk
+        self.frame_seconds = self.chunk / self.sample_rate
+        # NumPy loads here, in the background startup task, not at import
+        from nexa_vad import VoiceActivityDetector
+        self.vad = VoiceActivityDetector(self.sample_rate, trail=self.tail)
+        if self.adaptive:
+            from nexa_vad import NoiseTracker
+            self.noise = NoiseTracker(self.vad.frame_seconds, ratio=self.noise_ratio)
+        capacity = max(1, int(self.buffer_seconds / self.frame_seconds))
+        self.ring = RingBuffer(self.chunk * self.sample_width, capacity)
+        self.live = getattr(self.source, "live", True)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="nexa-capture", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while self.running:
+            try:
+                frame = self.source.read()
+            except Exception as e:
+                print(f"🎤 Capture error: {e}")
+                frame = None
+            if frame is not None and self.live:
+                self.track_noise(frame)
+            with self.condition:
+                if frame is None:
+                    self.ended = True
+                    self.condition.notify_all()
+                    return
+                while not self.live and self.running and self.ring.total - self.cursor >= self.ring.capacity:
+                    self.condition.wait(0.1)
+                self.ring.write(frame)
+                self.condition.notify_all()
+
+    def track_noise(self, frame):
+        """Feed one frame to the noise tracker and adopt its threshold"""
+        if self.noise is None:
+            return
+        threshold = self.noise.update(self.vad.features(frame)[0])
+        if threshold is not None:
+            self.energy_threshold = threshold
+
+    def advance(self, index):
+        """Everything before frame number index has been consumed"""
+        with self.condition:
+            self.cursor = index
+            self.condition.notify_all()
+
+    def now(self):
+        """Frame number listening should start from"""
+        with self.condition:
+            if self.live:
+                return max(self.cursor, self.ring.total)
+            return self.cursor
+
+    def exhausted(self):
+        """The stream has ended and every frame of it has been consumed"""
+        with self.condition:
+            return self.ended and self.cursor >= self.ring.total
+
+    def frames(self, seconds):
+        return max(1, int(round(seconds / self.frame_seconds)))
+
+    def _wait_for(self, index, deadline):
+        """Frame number index, or None once the stream ended or the deadline passed"""
+        with self.condition:
+            while self.ring.total <= index:
+                if self.ended:
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+            if index < self.ring.oldest():
+                return None
+            return self.ring.read(index, index + 1)
+
+    def _feed(self, on_frame, first, last):
+        """Hand frames first..last-1 to on_frame; True once it asks to stop"""
+        with self.condition:
+            data = self.ring.read(first, last)
+        size = self.ring.frame_bytes
+        for offset in range(0, len(data), size):
+            if on_frame(data[offset:offset + size]):
+                return True
+        return False
+
+    def next_utterance(self, timeout=15, phrase_time_limit=8, on_frame=None):
+        """Block until a phrase has been spoken; None on timeout or end of stream
+
+        on_frame, if given, sees every frame of the phrase as it arrives (pre-roll
+        first) and can end the phrase right away by returning True.
+        """
+        begin = self.now()
+        if self.live:
+            begin = max(self.cursor, begin - self.frames(self.pre_roll))
+        deadline = time.monotonic() + timeout + phrase_time_limit + 1
+        timeout_frames = self.frames(timeout)
+        limit_frames = self.frames(phrase_time_limit)
+        start = None
+        quiet = 0.0  # seconds since the last speech, at analysis-frame resolution
+        index = begin
+        while True:
+            with self.condition:
+                oldest = self.ring.oldest()
+            if index < oldest:
+                # The reader lapped us; whatever was not read is gone
+                self.overruns += 1
+                index = oldest
+                if start is not None and start < oldest:
+                    start = oldest
+            frame = self._wait_for(index, deadline)
+            if frame is None:
+                if start is None:
+                    self.advance(index)
+                    return None
+                break
+            if not self.live:
+                self.track_noise(frame)
+            mask = self.vad.speech_mask(frame, self.energy_threshold)
+            speech = bool(mask.any())
+            quiet = self.vad.trailing_silence(mask) if speech else quiet + self.frame_seconds
+            if start is None and self.draining:
+                if quiet >= self.pause_threshold:
+                    self.draining = False
+                    quiet = 0.0
+                elif index + 1 - begin >= timeout_frames:
+                    self.advance(index + 1)
+                    return None
+            elif start is None:
+                if speech:
+                    start = max(index - self.frames(self.pre_roll), begin, oldest)
+                    if on_frame and self._feed(on_frame, start, index + 1):
+                        self.draining = True
+                        index += 1
+                        break
+                elif index + 1 - begin >= timeout_frames:
+                    self.advance(index + 1)
+                    return None
+            else:
+                if on_frame and on_frame(frame):
+                    self.draining = True
+                    index += 1
+                    break
+                if quiet >= self.pause_threshold or index + 1 - start >= limit_frames:
+                    index += 1
+                    break
+            index += 1
+        with self.condition:
+            start = max(start, self.ring.oldest())
+            frame_data = self.ring.read(start, index)
+        self.advance(index)
+        # Pre-roll and the pause are only there to find the edges; cut them off
+        first, last = self.vad.trim(frame_data, self.energy_threshold)
+        METRICS.count("capture_trimmed_bytes", len(frame_data) - (last - first))
+        return Utterance(frame_data[first:last], self.sample_rate, self.sample_width, start, index)
+
+    def close(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=2)
+        self.source.close()
\ No newline at end of file
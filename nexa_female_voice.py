@@ -1,9 +1,8 @@
-import subprocess
-import tempfile
-import os
 from datetime import datetime
-import random
 import time
+from nexa_intents import CATALOG, FEMALE_VOICE_MATCHER
+from nexa_tts import get_speech_worker
+from nexa_normalizer import PRONUNCIATION
 
 class NEXA_Female_Voice:
     def __init__(self):
@@ -11,59 +10,34 @@ class NEXA_Female_Voice:
         
     def speak(self, text):
         """Female voice TTS with NEX-uh pronunciation"""
-        text = text.replace("NEXA", "NEX-uh")  # Changed to NEX-uh
+        text = PRONUNCIATION.normalize(text)
         print(f"🤖 NEXA: {text}")
         
-        # Female voice VBS script
-        vb_script = '''
-Dim speech
-Set speech = CreateObject("SAPI.SpVoice")
-
-' Try to set female voice
-For Each voice in speech.GetVoices
-    If InStr(voice.GetDescription, "Female") > 0 Or _
-       InStr(voice.GetDescription, "Zira") > 0 Or _
-       InStr(voice.GetDescription, "David") = 0 Then
-        Set speech.Voice = voice
-        Exit For
-    End If
-Next
-
-speech.Speak "''' + text.replace('"', "'") + '''"
-'''
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.vbs', delete=False) as f:
-            f.write(vb_script)
-            temp_file = f.name
-        
-        try:
-            subprocess.run(['cscript', '//B', '//Nologo', temp_file], timeout=30)
+        # Female voice is picked once by the speech worker
+        worker = get_speech_worker()
+        if worker.say(text, "female", timeout=30):
             print("🔊 Female Voice: Active")
-        except subprocess.TimeoutExpired:
+        elif worker.last_error == "timed out":
             print("🔊 Voice: Slow but working")
-        except Exception as e:
-            print(f"🔊 Voice: Issue - {e}")
-        finally:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+        else:
+            print(f"🔊 Voice: Issue - {worker.last_error}")
     
     def process_command(self, command):
         command = command.lower()
+        intent = FEMALE_VOICE_MATCHER.match(command)
         
-        if any(word in command for word in ['hello', 'hi', 'hey']):
-            return "Hello! I am NEX-uh with my new female voice. How can I assist you?"
-        elif 'time' in command:
-            return f"The current time is {datetime.now().strftime('%I:%M %p')}"
-        elif 'voice' in command:
-            return "This is my new female voice! Do you like how I sound now?"
-        elif 'your name' in command:
-            return "I am NEX-uh, your personal AI assistant."
-        elif 'test' in command:
-            return "This is a voice test. NEX-uh is speaking with female voice."
+        if intent == "greeting":
+            return CATALOG.reply("female.greeting")
+        elif intent == "time":
+            return CATALOG.reply("female.time", time=datetime.now().strftime('%I:%M %p'))
+        elif intent == "voice":
+            return CATALOG.reply("female.voice")
+        elif intent == "name":
+            return CATALOG.reply("female.name")
+        elif intent == "test":
+            return CATALOG.reply("female.test")
         else:
-            return "I'm NEX-uh with my new voice! Try asking for the time or my name."
+            return CATALOG.reply("female.unknown")
     
     def run(self):
         print("\n🚀 NEXA Female Voice Test Ready!")
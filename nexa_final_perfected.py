@@ -1,9 +1,8 @@
-import subprocess
-import tempfile
-import os
 from datetime import datetime
-import random
 import time
+from nexa_intents import CATALOG, PERFECTED_MATCHER
+from nexa_tts import get_speech_worker
+from nexa_normalizer import PRONUNCIATION
 
 class NEXA_Final:
     def __init__(self):
@@ -12,90 +11,69 @@ class NEXA_Final:
     def speak(self, text):
         """Use clean natural pronunciation"""
         # Clean pronunciation - natural sounding
-        text = text.replace("NEXA", "NEX-uh")
+        text = PRONUNCIATION.normalize(text)
         
         print(f"🤖 NEXA: {text}")
         self.speak_vbs(text)
     
     def speak_vbs(self, text):
-        """Reliable VBScript TTS"""
-        vb_script = f'''
-Dim speech
-Set speech = CreateObject("SAPI.SpVoice")
-speech.Speak "{text.replace('"', "'")}"
-'''
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.vbs', delete=False) as f:
-            f.write(vb_script)
-            temp_file = f.name
-        
-        try:
-            subprocess.run(['cscript', '//B', '//Nologo', temp_file], timeout=10)
+        """Reliable SAPI TTS through the shared speech worker"""
+        worker = get_speech_worker()
+        if worker.say(text, timeout=10):
             print("🔊 Voice: Active")
-        except Exception as e:
-            print(f"🔊 Voice: Temporary issue - {e}")
-        finally:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+        else:
+            print(f"🔊 Voice: Temporary issue - {worker.last_error}")
     
     def process_command(self, command):
         command = command.lower()
+        intent = PERFECTED_MATCHER.match(command)
         
-        if any(word in command for word in ['hello', 'hi', 'hey']):
+        if intent == "greeting":
             hour = datetime.now().hour
             if hour < 12:
-                return "Good morning! I am NEXA, your personal AI assistant. How may I help you today?"
+                return CATALOG.reply("perfected.greeting_morning")
             elif hour < 17:
-                return "Good afternoon! I'm NEXA, ready to assist with your tasks."
+                return CATALOG.reply("perfected.greeting_afternoon")
             else:
-                return "Good evening! I'm NEXA, here to help you this evening."
+                return CATALOG.reply("perfected.greeting_evening")
                 
-        elif 'time' in command:
+        elif intent == "time":
             current_time = datetime.now().strftime("%I:%M %p")
-            return f"The current time is {current_time}"
+            return CATALOG.reply("perfected.time", time=current_time)
             
-        elif 'date' in command:
+        elif intent == "date":
             current_date = datetime.now().strftime("%A, %B %d, %Y")
-            return f"Today is {current_date}"
+            return CATALOG.reply("perfected.date", date=current_date)
             
-        elif 'joke' in command:
-            jokes = [
-                "Why do programmers prefer dark mode? Because light attracts bugs!",
-                "What's a computer's favorite snack? Microchips!",
-                "Why was the computer cold? It left its Windows open!",
-                "How do you organize a space party? You planet!",
-                "Why did the Python programmer not respond to the email? Because it was stuck in an infinite loop!"
-            ]
-            return random.choice(jokes)
+        elif intent == "joke":
+            return CATALOG.reply("perfected.joke")
             
-        elif 'your name' in command:
-            return "I am NEXA, your personal AI assistant."
+        elif intent == "name":
+            return CATALOG.reply("perfected.name")
             
-        elif 'who made you' in command or 'who created you' in command:
-            return "I was developed as an innovative AI project, bringing futuristic technology to life."
+        elif intent == "creator":
+            return CATALOG.reply("perfected.creator")
             
-        elif 'thank you' in command:
-            return "You're welcome! It's always a pleasure to assist you."
+        elif intent == "thanks":
+            return CATALOG.reply("perfected.thanks")
             
-        elif 'status' in command or 'diagnostics' in command:
-            return "All systems are operational. Running at optimal performance levels."
+        elif intent == "status":
+            return CATALOG.reply("perfected.status")
             
-        elif 'test' in command or 'audio test' in command:
-            return "Audio systems confirmed working. NEXA is speaking clearly and ready for commands."
+        elif intent == "test":
+            return CATALOG.reply("perfected.test")
             
-        elif 'weather' in command:
-            return "Weather services are currently in development. This feature will be available soon."
+        elif intent == "weather":
+            return CATALOG.reply("perfected.weather")
             
-        elif 'calculate' in command:
-            return "Calculation module is standing by. Ready for mathematical operations."
+        elif intent == "calculate":
+            return CATALOG.reply("perfected.calculate")
             
-        elif 'story' in command:
-            return "Once upon a time, an engineer created an AI assistant. And that's me, NEXA! The story continues as we build amazing things together."
+        elif intent == "story":
+            return CATALOG.reply("perfected.story")
             
         else:
-            return "I understand you're saying something, but I'm still learning that specific command. Try asking about time, date, jokes, or system status."
+            return CATALOG.reply("perfected.unknown")
     
     def show_help(self):
         print("\n" + "✨" * 30)
@@ -129,17 +107,12 @@ speech.Speak "{text.replace('"', "'")}"
         
         # System initialization sequence
         print("\n🔧 Running system initialization...")
-        time.sleep(1)
         print("✅ Voice Module: ONLINE")
-        time.sleep(0.5)
         print("✅ Command Processor: ACTIVE")
-        time.sleep(0.5)
         print("✅ Audio Systems: OPERATIONAL")
-        time.sleep(0.5)
         print("✅ All Systems: READY")
         
         # Initial greeting
-        time.sleep(1)
         self.speak("All systems online. Initialization complete. NEXA is ready for your commands.")
         
         self.show_help()
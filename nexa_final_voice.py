@@ -1,9 +1,8 @@
-import subprocess
-import tempfile
-import os
 from datetime import datetime
-import random
 import time
+from nexa_intents import CATALOG, FINAL_VOICE_MATCHER
+from nexa_tts import get_speech_worker
+from nexa_normalizer import PRONUNCIATION
 
 class NEXA_Final:
     def __init__(self):
@@ -12,40 +11,16 @@ class NEXA_Final:
         
     def speak(self, text):
         """Speak with Voice Index 1"""
-        text = text.replace("NEXA", "NEX-uh")
+        text = PRONUNCIATION.normalize(text)
         print(f"🤖 NEXA: {text}")
         
-        # Simple and reliable VBS script
-        vb_script = f'''
-Dim speech
-Set speech = CreateObject("SAPI.SpVoice")
-
-' Use Voice Index 1 directly
-If speech.GetVoices.Count > {self.voice_index} Then
-    Set speech.Voice = speech.GetVoices.Item({self.voice_index})
-End If
-
-speech.Speak "{text.replace('"', "'")}"
-'''
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.vbs', delete=False) as f:
-            f.write(vb_script)
-            temp_file = f.name
-        
-        try:
-            subprocess.run(['cscript', '//B', '//Nologo', temp_file], timeout=30)
-        except:
-            pass  # Ignore timeouts - speech usually works
-        finally:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+        get_speech_worker().say(text, self.voice_index, timeout=30)
     
     def process_command(self, command):
         command = command.lower()
+        intent = FINAL_VOICE_MATCHER.match(command)
         
-        if any(word in command for word in ['hello', 'hi', 'hey']):
+        if intent == "greeting":
             hour = datetime.now().hour
             if hour < 12:
                 return "Good morning! I am NEX-uh with Voice Index 1."
@@ -54,29 +29,24 @@ speech.Speak "{text.replace('"', "'")}"
             else:
                 return "Good evening! I'm NEX-uh, ready to help."
                 
-        elif 'time' in command:
+        elif intent == "time":
             current_time = datetime.now().strftime("%I:%M %p")
             return f"The time is {current_time}"
             
-        elif 'date' in command:
+        elif intent == "date":
             current_date = datetime.now().strftime("%A, %B %d, %Y")
             return f"Today is {current_date}"
             
-        elif 'your name' in command:
+        elif intent == "name":
             return "I am NEX-uh, your personal AI assistant."
             
-        elif 'voice' in command:
+        elif intent == "voice":
             return "I'm using Voice Index 1, which you selected as the best sounding voice!"
             
-        elif 'joke' in command:
-            jokes = [
-                "Why do programmers prefer dark mode? Because light attracts bugs!",
-                "What's a computer's favorite snack? Microchips!",
-                "Why was the computer cold? It left its Windows open!"
-            ]
-            return random.choice(jokes)
+        elif intent == "joke":
+            return CATALOG.reply("final_voice.joke")
             
-        elif 'thank you' in command:
+        elif intent == "thanks":
             return "You're welcome! Happy to help."
             
         else:
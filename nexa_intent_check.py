@@ -0,0 +1,42 @@
+import argparse
+import json
+import os
+import sys
+from nexa_intents import CATALOG, IntentMatcher
+
+# Utterance -> expected intent (null: the default reply) per intent table
+CASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nexa_intent_cases.json")
+
+
+def check(cases):
+    """Mismatches as text lines, one per utterance that matched differently"""
+    problems = []
+    for table, expected in cases.items():
+        matcher = IntentMatcher(CATALOG.table(table))
+        utterances = list(expected)
+        for utterance, intent in zip(utterances, matcher.match_batch(utterances)):
+            if intent != expected[utterance]:
+                problems.append(f"{table}: '{utterance}' -> {intent}, expected {expected[utterance]}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check intent matching against the regression cases")
+    parser.add_argument("cases", nargs="?", default=CASES_PATH, help="cases JSON to check")
+    args = parser.parse_args()
+
+    with open(args.cases, "r", encoding="utf-8") as f:
+        cases = json.load(f)
+    problems = check(cases)
+    total = sum(len(expected) for expected in cases.values())
+    if problems:
+        print(f"🚨 {len(problems)} of {total} utterances matched differently")
+        for problem in problems:
+            print(f"   ❌ {problem}")
+        return 1
+    print(f"✅ All {total} utterances matched as expected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
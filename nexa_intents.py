@@ -0,0 +1,311 @@
+import re
+from bisect import bisect_left
+from collections import deque
+from nexa_metrics import METRICS
+from nexa_pack import get_catalog
+
+# Priority value used when no trigger phrase was found
+NO_MATCH = 1 << 30
+
+# Shorter phrases are only ever matched exactly: one typo away from "joke"
+# or "hello" is too many other words
+FUZZY_MIN_LENGTH = 6
+# A single word needs more: one edit turns "status" into "statue" and
+# "weather" into "whether", while a phrase has its other words to agree
+FUZZY_MIN_WORD_LENGTH = 8
+
+TOKENS = re.compile(r"[\w']+")
+
+
+def edit_limit(phrase):
+    """Typos tolerated in a phrase: one per six characters"""
+    return len(phrase) // 6
+
+
+def trigram_codes(text):
+    """Every 3-character window of text packed into one integer
+
+    Exact for ASCII; other characters may collide, which only adds
+    candidates for the edit-distance check to reject.
+    """
+    codes = [ord(ch) for ch in text]
+    return [(a << 16 ^ b << 8 ^ c) & 0xFFFFFFFF for a, b, c in zip(codes, codes[1:], codes[2:])]
+
+
+def word_distance(a, b, limit):
+    """Levenshtein distance between two words, or limit + 1 once it must exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def aligned_distance(words, tokens, limit):
+    """Edits turning tokens into words, pair by pair; limit + 1 if over limit
+
+    Each word has to keep its first letter. Typos rarely hit it, and
+    without the rule a dropped first letter lets "how old" pass for "how
+    cold" and "who are you" for "how are you".
+    """
+    total = 0
+    for word, token in zip(words, tokens):
+        if word[0] != token[0]:
+            return limit + 1
+        if word != token:
+            total += word_distance(word, token, limit - total)
+            if total > limit:
+                return limit + 1
+    return total
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over every trigger phrase of an intent table"""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.best = [NO_MATCH]
+
+        for phrase, priority in patterns:
+            state = 0
+            for ch in phrase:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.best.append(NO_MATCH)
+                state = nxt
+            if priority < self.best[state]:
+                self.best[state] = priority
+
+        # Failure links, filled breadth first so shorter suffixes are ready first
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                # A state also reports every phrase that ends on its suffix
+                if self.best[self.fail[nxt]] < self.best[nxt]:
+                    self.best[nxt] = self.best[self.fail[nxt]]
+
+    def scan(self, text, stop=0):
+        """Return the best (lowest) priority found in one pass over the text"""
+        goto, fail, best = self.goto, self.fail, self.best
+        state = 0
+        found = NO_MATCH
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if best[state] < found:
+                found = best[state]
+                if found <= stop:
+                    break
+        return found
+
+
+class IntentMatcher:
+    """Classify an utterance against one compiled intent table from the pack
+
+    The table is the automaton of PhraseAutomaton flattened into arrays,
+    with each state's edges sorted so a transition is a binary search.
+    Matching costs the same however many phrasings the pack holds.
+    Transitions already resolved (fail links included) are remembered in a
+    bounded dict, since utterances keep walking the same few states.
+
+    When no phrase occurs exactly, a text that is word for word one of the
+    table's example phrasings takes that example's intent. Otherwise the
+    trigram index proposes the phrases sharing enough trigrams with the
+    text, and only those are compared, whole word against whole word, with
+    a bounded edit distance, so "wat time is it" still finds "what time is
+    it" without comparing against every phrase. Failing that, a semantic
+    classifier over the example phrasings (see nexa_semantic) catches
+    paraphrases such as "got the time?".
+    """
+
+    MOVE_CACHE_SIZE = 1 << 16
+
+    def __init__(self, table):
+        self.table = table
+        self.names = table.names
+        self.early = table.early
+        self.moves = {}
+        self.phrase_words = {}  # fuzzy phrase index -> its words
+        self.examples = None  # example phrasing -> intent priority, built on first use
+        self.classifier = None
+
+    def step(self, state, code):
+        """Goto transition for one character code, or -1 if there is none"""
+        table = self.table
+        end = table.starts[state + 1]
+        index = bisect_left(table.chars, code, table.starts[state], end)
+        if index < end and table.chars[index] == code:
+            return table.nexts[index]
+        return -1
+
+    def move(self, state, code):
+        """Next state after one character, following failure links as needed"""
+        key = state << 21 | code
+        nxt = self.step(state, code)
+        while nxt < 0 and state:
+            state = self.table.fail[state]
+            nxt = self.step(state, code)
+        nxt = max(nxt, 0)
+        if len(self.moves) >= self.MOVE_CACHE_SIZE:
+            self.moves.clear()
+        self.moves[key] = nxt
+        return nxt
+
+    def scan(self, text, stop=0):
+        """Return the best (lowest) priority found in one pass over the text"""
+        moves, best = self.moves, self.table.best
+        state = 0
+        found = NO_MATCH
+        for ch in text:
+            code = ord(ch)
+            nxt = moves.get(state << 21 | code)
+            state = nxt if nxt is not None else self.move(state, code)
+            if best[state] < found:
+                found = best[state]
+                if found <= stop:
+                    break
+        return found
+
+    def classify(self, text):
+        """Run the automaton, keeping the if/elif order of the original branches"""
+        priority = self.scan(text)
+        if priority == NO_MATCH:
+            return None
+        return self.names[priority]
+
+    def candidates(self, text):
+        """Fuzzy phrase index -> trigrams it shares with text"""
+        table = self.table
+        grams, starts, postings = table.grams, table.gram_starts, table.postings
+        shared = {}
+        for gram in set(trigram_codes(text)):
+            index = bisect_left(grams, gram)
+            if index < len(grams) and grams[index] == gram:
+                for phrase in postings[starts[index]:starts[index + 1]]:
+                    shared[phrase] = shared.get(phrase, 0) + 1
+        return shared
+
+    def example_intent(self, text):
+        """Intent of the example phrasing the text is word for word, or None"""
+        if self.examples is None:
+            examples = {}
+            for example, owner in zip(self.table.examples(), self.table.example_owners):
+                examples.setdefault(" ".join(TOKENS.findall(example)), owner)
+            self.examples = examples
+        owner = self.examples.get(" ".join(TOKENS.findall(text)))
+        return None if owner is None else self.names[owner]
+
+    def fuzzy(self, text):
+        """Intent of the phrase found in text with the fewest typos, or None
+
+        Ties go to the intent that comes first, as in classify().
+        """
+        table = self.table
+        tokens = TOKENS.findall(text)
+        best = None
+        for index, count in self.candidates(text).items():
+            if count < table.needed[index]:
+                continue
+            words = self.phrase_words.get(index)
+            if words is None:
+                words = self.phrase_words[index] = TOKENS.findall(table.phrase_at(index))
+            limit = table.limits[index]
+            for start in range(len(tokens) - len(words) + 1):
+                distance = aligned_distance(words, tokens[start:start + len(words)], limit)
+                if distance <= limit:
+                    rank = (distance, table.owners[index])
+                    if best is None or rank < best:
+                        best = rank
+        if best is None:
+            return None
+        METRICS.count("intent_fuzzy_matches")
+        return self.names[best[1]]
+
+    def semantic(self):
+        """The table's paraphrase classifier, built on first use; None if NEXA_SEMANTIC=0"""
+        if self.classifier is None:
+            # NumPy is only imported once some utterance gets this far
+            from nexa_semantic import SemanticClassifier, semantic_enabled
+            self.classifier = SemanticClassifier.from_table(self.table) if semantic_enabled() else False
+        return self.classifier or None
+
+    def paraphrases(self, texts):
+        """Classifier intents (or None) for texts no phrase matched, scored as one batch"""
+        classifier = self.semantic()
+        if classifier is None or not texts:
+            return [None] * len(texts)
+        intents = [intent for intent, _ in classifier.predict(texts)]
+        METRICS.count("intent_semantic_matches", sum(intent is not None for intent in intents))
+        return intents
+
+    def match_phrases(self, text):
+        """Every tier before the classifier: exact phrase, exact example, typo"""
+        return self.classify(text) or self.example_intent(text) or self.fuzzy(text)
+
+    def match(self, text):
+        """Return the intent name for the text, or None for the default branch"""
+        if not text:
+            return None
+        return self.match_phrases(text) or self.paraphrases([text])[0]
+
+    def match_batch(self, texts):
+        """match() for many texts, with one classifier call for all that need it"""
+        intents = [self.match_phrases(text) if text else None for text in texts]
+        missed = [index for index, text in enumerate(texts) if text and intents[index] is None]
+        for index, intent in zip(missed, self.paraphrases([texts[index] for index in missed])):
+            intents[index] = intent
+        return intents
+
+    def is_phrase(self, text):
+        """Whether the text is exactly one trigger phrase of the table"""
+        state = 0
+        for ch in text:
+            state = self.step(state, ord(ch))
+            if state < 0:
+                return False
+        return self.table.end[state] != NO_MATCH
+
+    def match_early(self, partial):
+        """Intent to answer before the user has finished, or None
+
+        Only a partial transcript that is exactly one trigger phrase of an
+        early intent counts as confident enough to act on.
+        """
+        if not partial:
+            return None
+        partial = partial.strip()
+        if not self.is_phrase(partial):
+            return None
+        intent = self.classify(partial)
+        return intent if intent in self.early else None
+
+
+# Intent tables live in nexa_pack.json, each in the priority order of its
+# process_command; the compiled pack is mapped here and shared by every process
+CATALOG = get_catalog()
+
+REAL_VOICE_MATCHER = IntentMatcher(CATALOG.table("real_voice"))
+REAL_VOICE_EXIT_MATCHER = IntentMatcher(CATALOG.table("real_voice_exit"))
+PROPER_MATCHER = IntentMatcher(CATALOG.table("proper"))
+VOICE_INPUT_MATCHER = IntentMatcher(CATALOG.table("voice_input"))
+NO_PYAUDIO_MATCHER = IntentMatcher(CATALOG.table("no_pyaudio"))
+PERFECTED_MATCHER = IntentMatcher(CATALOG.table("perfected"))
+FINAL_VOICE_MATCHER = IntentMatcher(CATALOG.table("final_voice"))
+FEMALE_VOICE_MATCHER = IntentMatcher(CATALOG.table("female_voice"))
\ No newline at end of file
@@ -1,68 +1,41 @@
-import subprocess
-import tempfile
-import os
 from datetime import datetime, timedelta
-import random
 import time
-import json
-import threading
+from nexa_intents import CATALOG, PROPER_MATCHER
+from nexa_tts import get_speech_worker
+from nexa_normalizer import PRONUNCIATION
+from nexa_journal import JournalStore
+from nexa_scheduler import ReminderScheduler, next_time_of_day
+from nexa_reminder_index import ReminderIndex, spoken_when
 
 class NEXA_Proper:
     def __init__(self):
         print("🔊 Initializing NEXA Systems...")
         self.voice_index = 1
         self.user_name = ""  # Will ask for your name
-        self.reminders = []
-        self.alarms = []
+        self.reminders = {}
+        self.alarms = {}
         self.load_data()
+        self.scheduler = ReminderScheduler(self.deliver_due)
+        self.schedule_pending()
+        self.scheduler.start()
         
     def load_data(self):
         """Load NEXA data"""
-        try:
-            with open("nexa_data.json", "r") as f:
-                data = json.load(f)
-                self.reminders = data.get("reminders", [])
-                self.alarms = data.get("alarms", [])
+        self.store = JournalStore("nexa_data")
+        self.reminders = self.store.table("reminders")
+        self.alarms = self.store.table("alarms")
+        self.reminder_index = ReminderIndex(self.reminders)
+        if self.store.loaded:
             print("✅ Data loaded")
-        except:
+        else:
             print("📁 Starting fresh session")
     
-    def save_data(self):
-        """Save NEXA data"""
-        data = {
-            "reminders": self.reminders,
-            "alarms": self.alarms
-        }
-        with open("nexa_data.json", "w") as f:
-            json.dump(data, f, indent=2)
-    
     def speak(self, text):
         """NEXA speaking - clean and professional"""
-        text = text.replace("NEXA", "NEX-uh")
+        text = PRONUNCIATION.normalize(text)
         print(f"🤖 NEXA: {text}")
         
-        vb_script = f'''
-Dim speech
-Set speech = CreateObject("SAPI.SpVoice")
-If speech.GetVoices.Count > {self.voice_index} Then
-    Set speech.Voice = speech.GetVoices.Item({self.voice_index})
-End If
-speech.Speak "{text.replace('"', "'")}"
-'''
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.vbs', delete=False) as f:
-            f.write(vb_script)
-            temp_file = f.name
-        
-        try:
-            subprocess.run(['cscript', '//B', '//Nologo', temp_file], timeout=20)
-        except:
-            pass
-        finally:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+        get_speech_worker().say(text, self.voice_index)
     
     def get_user_name(self):
         """Get your name for personalization"""
@@ -81,67 +54,152 @@ speech.Speak "{text.replace('"', "'")}"
     # NEXA FEATURES
     def system_status(self):
         """Simple system status"""
-        return "Systems are ready and waiting for your command."
+        return CATALOG.reply("proper.status")
+    
+    def schedule_pending(self):
+        """Hand every reminder and alarm that has not fired yet to the scheduler"""
+        pending = []
+        for record_id, reminder in self.reminders.items():
+            if reminder.get("due") and not reminder.get("done"):
+                pending.append((("reminders", record_id), reminder["due"]))
+        for record_id, alarm in self.alarms.items():
+            if alarm.get("due") and alarm.get("active"):
+                pending.append((("alarms", record_id), alarm["due"]))
+        self.scheduler.schedule_many(pending)
     
-    def set_reminder(self, reminder_text, time_str):
+    def deliver_due(self, key, seconds_late):
+        """Scheduler callback: say the reminder or ring the alarm"""
+        table, record_id = key
+        record = self.store.table(table).get(record_id)
+        if not record:
+            return
+        missed = "While I was offline: " if seconds_late > 60 else ""
+        if table == "reminders":
+            self.store.update("reminders", record_id, done=True)
+            self.reminder_index.remove(record_id)
+            self.speak(f"{missed}Reminder - {record['text']}")
+        else:
+            self.store.update("alarms", record_id, active=False)
+            self.speak(f"{missed}Alarm! It's {record['time']}.")
+    
+    def set_reminder(self, reminder_text, time_str, due=None):
         """Set a reminder"""
         reminder = {
             "text": reminder_text,
             "time": time_str,
             "created": datetime.now().isoformat()
         }
-        self.reminders.append(reminder)
-        self.save_data()
-        return f"I'll remind you: '{reminder_text}' at {time_str}"
+        if due:
+            reminder["due"] = due.timestamp()
+        record_id = self.store.add("reminders", reminder)
+        self.reminder_index.add(record_id, self.reminders[record_id])
+        if due:
+            self.scheduler.schedule(("reminders", record_id), reminder["due"])
+        return CATALOG.reply("proper.reminder_set", task=reminder_text, time=time_str)
+    
+    def reminder_range(self, command):
+        """Time window a reminder query asks about, as (start, end, label)"""
+        now = datetime.now()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if 'tomorrow' in command:
+            start = midnight + timedelta(days=1)
+            return start.timestamp(), (start + timedelta(days=1)).timestamp(), "for tomorrow"
+        if 'today' in command:
+            return midnight.timestamp(), (midnight + timedelta(days=1)).timestamp(), "for today"
+        if 'week' in command:
+            return now.timestamp(), (midnight + timedelta(days=8)).timestamp(), "this week"
+        return now.timestamp(), float("inf"), "coming up"
+    
+    def describe_reminders(self, record_ids, label, limit=5):
+        """Speakable list of reminders, at most limit of them"""
+        if not record_ids:
+            return CATALOG.reply("proper.no_reminders", label=label)
+        items = []
+        for record_id in record_ids[:limit]:
+            reminder = self.reminders[record_id]
+            items.append(f"{reminder['text']} {spoken_when(reminder)}")
+        count = len(record_ids)
+        text = f"You have {count} reminder{'s' if count != 1 else ''} {label}: " + "; ".join(items)
+        if count > limit:
+            text += f"; and {count - limit} more"
+        return text + "."
     
-    def set_alarm(self, alarm_time):
+    def list_reminders(self, command):
+        start, end, label = self.reminder_range(command)
+        return self.describe_reminders(self.reminder_index.between(start, end), label)
+    
+    def find_reminders(self, command):
+        for marker in ('anything about', 'reminders about'):
+            if marker in command:
+                query = command.split(marker, 1)[1]
+                break
+        else:
+            query = command
+        query = query.strip(' ?.!')
+        if not query:
+            return CATALOG.reply("proper.find_prompt")
+        return self.describe_reminders(self.reminder_index.search(query), f"about {query}")
+    
+    def set_alarm(self, alarm_time, due=None):
         """Set an alarm"""
         alarm = {
             "time": alarm_time,
             "active": True
         }
-        self.alarms.append(alarm)
-        self.save_data()
-        return f"Alarm set for {alarm_time}"
+        if due:
+            alarm["due"] = due.timestamp()
+        record_id = self.store.add("alarms", alarm)
+        if due:
+            self.scheduler.schedule(("alarms", record_id), alarm["due"])
+        return CATALOG.reply("proper.alarm_set", time=alarm_time)
     
     def process_command(self, command):
         """Process commands for NEXA"""
         if not command:
-            return "I didn't hear that. Could you try again?"
+            return CATALOG.reply("proper.not_heard")
+        
+        intent = PROPER_MATCHER.match(command)
         
         # NEXA RESPONSES
-        if any(word in command for word in ['system', 'status', 'diagnostic']):
+        if intent == "status":
             return self.system_status()
         
-        elif any(word in command for word in ['reminder', 'remember']):
+        elif intent == "list_reminders":
+            return self.list_reminders(command)
+        
+        elif intent == "find_reminders":
+            return self.find_reminders(command)
+        
+        elif intent == "reminder":
             if 'tomorrow' in command:
-                time_str = (datetime.now() + timedelta(days=1)).strftime("%I:%M %p")
+                due = datetime.now() + timedelta(days=1)
+                time_str = due.strftime("%I:%M %p")
                 task = command.replace('reminder', '').replace('remember', '').replace('tomorrow', '').strip()
-                return self.set_reminder(task, time_str)
-            return "What would you like me to remind you about?"
+                return self.set_reminder(task, time_str, due)
+            return CATALOG.reply("proper.reminder_prompt")
         
-        elif any(word in command for word in ['alarm', 'wake']):
+        elif intent == "alarm":
             if '5' in command and 'am' in command:
-                return self.set_alarm("5:00 AM")
-            return "What time should I set the alarm for?"
+                return self.set_alarm("5:00 AM", next_time_of_day(5))
+            return CATALOG.reply("proper.alarm_prompt")
         
-        elif 'time' in command:
-            return f"The time is {datetime.now().strftime('%I:%M %p')}"
+        elif intent == "time":
+            return CATALOG.reply("proper.time", time=datetime.now().strftime('%I:%M %p'))
         
-        elif 'date' in command:
-            return f"Today is {datetime.now().strftime('%A, %B %d, %Y')}"
+        elif intent == "date":
+            return CATALOG.reply("proper.date", date=datetime.now().strftime('%A, %B %d, %Y'))
         
-        elif any(word in command for word in ['thank you', 'thanks']):
-            return "You're welcome!"
+        elif intent == "thanks":
+            return CATALOG.reply("proper.thanks")
         
-        elif any(word in command for word in ['how are you']):
-            return "I'm functioning well, thank you for asking!"
+        elif intent == "how_are_you":
+            return CATALOG.reply("proper.how_are_you")
         
-        elif any(word in command for word in ['stop', 'exit', 'shutdown']):
+        elif intent == "stop":
             return "stop"
         
         else:
-            return f"I understand you said '{command}'. How can I help with that?"
+            return CATALOG.reply("proper.unknown", command=command)
     
     def show_nexa_capabilities(self):
         print("\n" + "🌟" * 25)
@@ -150,6 +208,7 @@ speech.Speak "{text.replace('"', "'")}"
         print("🎯 Available Commands:")
         print("   • System status")
         print("   • Set reminders") 
+        print("   • List or search reminders")
         print("   • Set alarms")
         print("   • Check time/date")
         print("   • General assistance")
@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+
+
+class JournalStore:
+    """Reminders and alarms as an append-only record log with snapshot compaction
+
+    Every change is one JSON line appended to <base>.journal, so adding a
+    reminder costs the same whether there are ten or a million. Once the
+    journal holds as many records as there are live ones (and at least
+    compact_every), the tables are written to <base>.snapshot.json and the
+    journal starts over, which keeps replay at startup short.
+
+    Records carry a sequence number. A torn last line from a crash is cut
+    off on load, and journal lines already covered by the snapshot are
+    skipped, so a crash at any point leaves a readable store. An old
+    <base>.json file is imported the first time.
+    """
+
+    def __init__(self, base="nexa_data", tables=("reminders", "alarms"), compact_every=1000, durable=True):
+        self.journal_path = base + ".journal"
+        self.snapshot_path = base + ".snapshot.json"
+        self.legacy_path = base + ".json"
+        self.compact_every = compact_every
+        self.durable = durable
+        self.tables = {name: {} for name in tables}
+        self.seq = 0
+        self.next_id = 1
+        self.journal_records = 0
+        self.loaded = False
+        self.journal = None
+        # The reminder scheduler writes from its own thread
+        self.lock = threading.RLock()
+        self.load()
+
+    def table(self, name):
+        """Live records of one table: id -> record, oldest first"""
+        return self.tables[name]
+
+    def load(self):
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self.seq = snapshot["seq"]
+            self.next_id = snapshot["next_id"]
+            for name, records in snapshot["tables"].items():
+                self.tables.setdefault(name, {}).update((int(key), record) for key, record in records.items())
+            self.loaded = True
+
+        if os.path.exists(self.journal_path):
+            self.replay()
+            self.loaded = True
+        elif not self.loaded and os.path.exists(self.legacy_path):
+            self.import_legacy()
+
+        self.journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def replay(self):
+        good_bytes = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash; everything after it is dropped
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                good_bytes += len(line)
+                self.journal_records += 1
+                if entry["seq"] > self.seq:
+                    self.apply(entry)
+        if good_bytes < os.path.getsize(self.journal_path):
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(good_bytes)
+
+    def import_legacy(self):
+        try:
+            with open(self.legacy_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for name in self.tables:
+            for record in data.get(name, []):
+                record_id = self.next_id
+                self.next_id += 1
+                self.tables[name][record_id] = dict(record, id=record_id)
+        self.loaded = True
+        self.write_snapshot()
+
+    def apply(self, entry):
+        self.seq = entry["seq"]
+        table = self.tables.setdefault(entry["table"], {})
+        record_id = entry["id"]
+        if entry["op"] == "add":
+            table[record_id] = entry["record"]
+            self.next_id = max(self.next_id, record_id + 1)
+        elif entry["op"] == "set":
+            if record_id in table:
+                table[record_id].update(entry["record"])
+        elif entry["op"] == "del":
+            table.pop(record_id, None)
+
+    def write(self, op, table, record_id, record=None):
+        with self.lock:
+            entry = {"seq": self.seq + 1, "op": op, "table": table, "id": record_id}
+            if record is not None:
+                entry["record"] = record
+            self.journal.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self.journal.flush()
+            if self.durable:
+                os.fsync(self.journal.fileno())
+            self.apply(entry)
+            self.journal_records += 1
+            live = sum(len(records) for records in self.tables.values())
+            if self.journal_records >= max(self.compact_every, live):
+                self.compact()
+
+    def add(self, table, record):
+        """Store a new record and return its id"""
+        with self.lock:
+            record_id = self.next_id
+            self.write("add", table, record_id, dict(record, id=record_id))
+            return record_id
+
+    def update(self, table, record_id, **fields):
+        self.write("set", table, record_id, fields)
+
+    def delete(self, table, record_id):
+        self.write("del", table, record_id)
+
+    def write_snapshot(self):
+        snapshot = {"seq": self.seq, "next_id": self.next_id, "tables": self.tables}
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+            f.flush()
+            if self.durable:
+                os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot and start an empty journal"""
+        self.write_snapshot()
+        # Lines left over after a crash here are skipped by their seq on replay
+        self.journal.close()
+        self.journal = open(self.journal_path, "w", encoding="utf-8")
+        self.journal_records = 0
+
+    def close(self):
+        if self.journal:
+            self.journal.close()
+            self.journal = None
\ No newline at end of file
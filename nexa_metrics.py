@@ -0,0 +1,297 @@
+import atexit
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Bucket edges for the Prometheus export, in seconds
+EXPORT_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """Log-linear latency buckets in the style of HdrHistogram
+
+    Values are kept in microseconds. Below 64 us every value has its own
+    bucket; above that each power of two is split into 32 buckets, so any
+    percentile is within about 3% of the true value whatever the range,
+    while memory only grows with the number of distinct buckets hit.
+    """
+
+    SUB_BUCKETS = 32
+
+    def __init__(self):
+        self.counts = {}  # bucket index -> count
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def bucket(cls, micros):
+        shift = max(0, micros.bit_length() - 6)
+        return shift * cls.SUB_BUCKETS + (micros >> shift)
+
+    @classmethod
+    def bucket_range(cls, index):
+        """Lowest and one-past-highest microsecond value of a bucket"""
+        if index < 2 * cls.SUB_BUCKETS:
+            return index, index + 1
+        shift = index // cls.SUB_BUCKETS - 1
+        mantissa = index - shift * cls.SUB_BUCKETS
+        return mantissa << shift, (mantissa + 1) << shift
+
+    def record(self, seconds):
+        micros = max(0, int(seconds * 1000000))
+        index = self.bucket(micros)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0.0
+        target = max(1, int(round(fraction * self.count)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                low, high = self.bucket_range(index)
+                return min(self.max, (low + high) / 2 / 1000000)
+        return self.max
+
+    def cumulative(self, bounds=EXPORT_BOUNDS):
+        """(bound, count of values at or under it) for each export bound"""
+        result = []
+        ordered = sorted(self.counts.items())
+        position = 0
+        seen = 0
+        for bound in bounds:
+            limit = bound * 1000000
+            while position < len(ordered) and self.bucket_range(ordered[position][0])[1] <= limit:
+                seen += ordered[position][1]
+                position += 1
+            result.append((bound, seen))
+        return result
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min or 0.0,
+            "max": self.max or 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class TurnTrace:
+    """Spans recorded during one conversation turn"""
+
+    def __init__(self, number):
+        self.number = number
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.spans = []  # (name, offset from turn start, seconds)
+        self.duration = None
+
+    def add(self, name, start, seconds):
+        self.spans.append((name, start - self.started, seconds))
+
+    def to_dict(self):
+        return {
+            "turn": self.number,
+            "started_at": self.started_at,
+            "seconds": self.duration,
+            "spans": [{"name": name, "offset": offset, "seconds": seconds} for name, offset, seconds in self.spans],
+        }
+
+
+_current_trace = contextvars.ContextVar("nexa_turn_trace", default=None)
+
+
+class Metrics:
+    """Latency histograms, counters and per-turn traces for one process"""
+
+    def __init__(self, keep_traces=100):
+        self.histograms = {}
+        self.counters = {}
+        self.traces = deque(maxlen=keep_traces)
+        self.turns = 0
+        self.lock = threading.Lock()
+
+    def observe(self, name, seconds, start=None):
+        """Record one duration; it also becomes a span of the current turn, if any"""
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(seconds)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(name, start if start is not None else time.perf_counter() - seconds, seconds)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def timed(self, name):
+        """Decorator that times every call of a function under name"""
+
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start, start)
+            return wrapper
+
+        return decorate
+
+    def span(self, name):
+        """Context manager form of timed()"""
+        return _Span(self, name)
+
+    def turn(self):
+        """Context manager that collects the spans of one conversation turn"""
+        return _Turn(self)
+
+    def add_trace(self, number, timings):
+        """Store a turn measured elsewhere (e.g. by the pipeline) as stage -> seconds"""
+        trace = TurnTrace(number)
+        offset = trace.started
+        for name, seconds in timings.items():
+            trace.add(name, offset, seconds)
+            offset += seconds
+        trace.duration = sum(timings.values())
+        with self.lock:
+            self.traces.append(trace)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "histograms": {name: histogram.summary() for name, histogram in self.histograms.items()},
+                "counters": dict(self.counters),
+                "traces": [trace.to_dict() for trace in self.traces],
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        lines = []
+        with self.lock:
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f"nexa_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for bound, seen in histogram.cumulative():
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {seen}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum {histogram.total}")
+                lines.append(f"{metric}_count {histogram.count}")
+            for name, value in sorted(self.counters.items()):
+                metric = f"nexa_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Dump to a file: Prometheus text for .prom, JSON otherwise"""
+        text = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """Local HTTP endpoint: /metrics (Prometheus), /metrics.json and /traces"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, kind = metrics.to_prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, kind = metrics.to_json(), "application/json"
+                elif self.path == "/traces":
+                    body, kind = json.dumps(metrics.snapshot()["traces"], indent=2), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="nexa-metrics", daemon=True).start()
+        return server
+
+
+class _Span:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, self.start)
+        return False
+
+
+class _Turn:
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def __enter__(self):
+        with self.metrics.lock:
+            self.metrics.turns += 1
+            self.trace = TurnTrace(self.metrics.turns)
+        self.token = _current_trace.set(self.trace)
+        return self.trace
+
+    def __exit__(self, *exc):
+        _current_trace.reset(self.token)
+        self.trace.duration = time.perf_counter() - self.trace.started
+        self.metrics.observe("turn", self.trace.duration, self.trace.started)
+        with self.metrics.lock:
+            self.metrics.traces.append(self.trace)
+        return False
+
+
+METRICS = Metrics()
+_exporting = False
+
+
+def start_metrics_export():
+    """Serve or dump METRICS as asked by NEXA_METRICS_PORT / NEXA_METRICS_FILE (once)"""
+    global _exporting
+    if _exporting:
+        return
+    _exporting = True
+    port = os.environ.get("NEXA_METRICS_PORT")
+    if port:
+        METRICS.serve(int(port))
+        print(f"📈 Metrics on http://127.0.0.1:{port}/metrics")
+    path = os.environ.get("NEXA_METRICS_FILE")
+    if path:
+        atexit.register(METRICS.write, path)
\ No newline at end of file
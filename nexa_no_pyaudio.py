@@ -1,10 +1,9 @@
-import subprocess
-import tempfile
-import os
 from datetime import datetime, timedelta
-import random
 import time
-import json
+from nexa_intents import CATALOG, NO_PYAUDIO_MATCHER
+from nexa_tts import get_speech_worker
+from nexa_normalizer import PRONUNCIATION
+from nexa_scheduler import ReminderScheduler, next_time_of_day
 
 class NEXA_No_PyAudio:
     def __init__(self):
@@ -12,34 +11,15 @@ class NEXA_No_PyAudio:
         self.voice_index = 1
         self.reminders = []
         self.alarms = []
+        self.scheduler = ReminderScheduler(self.deliver_due)
+        self.scheduler.start()
         
     def speak(self, text):
         """NEXA speaking"""
-        text = text.replace("NEXA", "NEX-uh")
+        text = PRONUNCIATION.normalize(text)
         print(f"🤖 NEXA: {text}")
         
-        vb_script = f'''
-Dim speech
-Set speech = CreateObject("SAPI.SpVoice")
-If speech.GetVoices.Count > {self.voice_index} Then
-    Set speech.Voice = speech.GetVoices.Item({self.voice_index})
-End If
-speech.Speak "{text.replace('"', "'")}"
-'''
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.vbs', delete=False) as f:
-            f.write(vb_script)
-            temp_file = f.name
-        
-        try:
-            subprocess.run(['cscript', '//B', '//Nologo', temp_file], timeout=20)
-        except:
-            pass
-        finally:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+        get_speech_worker().say(text, self.voice_index)
     
     def voice_command_simulation(self):
         """Simulate voice commands without PyAudio"""
@@ -59,7 +39,19 @@ speech.Speak "{text.replace('"', "'")}"
         
         return command
     
-    def set_reminder(self, reminder_text, time_str):
+    def deliver_due(self, key, seconds_late):
+        """Scheduler callback: say the reminder or ring the alarm"""
+        table, index = key
+        if table == "reminders":
+            reminder = self.reminders[index]
+            reminder["done"] = True
+            self.speak(f"Reminder - {reminder['text']}")
+        else:
+            alarm = self.alarms[index]
+            alarm["active"] = False
+            self.speak(f"Alarm! It's {alarm['time']}.")
+    
+    def set_reminder(self, reminder_text, time_str, due=None):
         """Set a reminder"""
         reminder = {
             "text": reminder_text,
@@ -67,15 +59,21 @@ speech.Speak "{text.replace('"', "'")}"
             "created": datetime.now().isoformat()
         }
         self.reminders.append(reminder)
+        if due:
+            reminder["due"] = due.timestamp()
+            self.scheduler.schedule(("reminders", len(self.reminders) - 1), reminder["due"])
         return f"I'll remind you: '{reminder_text}' at {time_str}"
     
-    def set_alarm(self, alarm_time):
+    def set_alarm(self, alarm_time, due=None):
         """Set an alarm"""
         alarm = {
             "time": alarm_time,
             "active": True
         }
         self.alarms.append(alarm)
+        if due:
+            alarm["due"] = due.timestamp()
+            self.scheduler.schedule(("alarms", len(self.alarms) - 1), alarm["due"])
         return f"Alarm set for {alarm_time}"
     
     def process_command(self, command):
@@ -83,36 +81,34 @@ speech.Speak "{text.replace('"', "'")}"
         if not command:
             return "I didn't hear anything. Please try again."
         
-        if any(word in command for word in ['hello', 'hi', 'hey', 'nexa']):
+        intent = NO_PYAUDIO_MATCHER.match(command)
+        
+        if intent == "greeting":
             return "Hello! I'm listening to your voice commands!"
         
-        elif any(word in command for word in ['time']):
+        elif intent == "time":
             return f"The time is {datetime.now().strftime('%I:%M %p')}"
         
-        elif any(word in command for word in ['date']):
+        elif intent == "date":
             return f"Today is {datetime.now().strftime('%A, %B %d, %Y')}"
         
-        elif any(word in command for word in ['joke']):
-            jokes = [
-                "Why do programmers prefer dark mode? Because light attracts bugs!",
-                "What's a computer's favorite snack? Microchips!",
-                "Why was the computer cold? It left its Windows open!"
-            ]
-            return random.choice(jokes)
+        elif intent == "joke":
+            return CATALOG.reply("no_pyaudio.joke")
         
-        elif any(word in command for word in ['reminder', 'remember']):
+        elif intent == "reminder":
             if 'tomorrow' in command:
-                time_str = (datetime.now() + timedelta(days=1)).strftime("%I:%M %p")
+                due = datetime.now() + timedelta(days=1)
+                time_str = due.strftime("%I:%M %p")
                 task = command.replace('reminder', '').replace('remember', '').replace('tomorrow', '').strip()
-                return self.set_reminder(task, time_str)
+                return self.set_reminder(task, time_str, due)
             return "What would you like me to remind you about?"
         
-        elif any(word in command for word in ['alarm']):
+        elif intent == "alarm":
             if '5' in command and 'am' in command:
-                return self.set_alarm("5:00 AM")
+                return self.set_alarm("5:00 AM", next_time_of_day(5))
             return "What time should I set the alarm for?"
         
-        elif any(word in command for word in ['stop', 'exit', 'quit']):
+        elif intent == "stop":
             return "stop"
         
         else:
@@ -0,0 +1,117 @@
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+# How NEXA should say its own name, however a reply spells it
+PRONUNCIATIONS = {
+    "NEXA": "NEX-uh",
+    "N E X A": "NEX-uh",
+    "N-E-X-A": "NEX-uh",
+}
+
+# Formal phrasing that sounds robotic when spoken
+CONTRACTIONS = {
+    "i am": "I'm",
+    "it is": "it's",
+    "i will": "I'll",
+    "do not": "don't",
+    "cannot": "can't",
+    "i have": "I've",
+    "you are": "you're",
+    "what is": "what's",
+}
+
+
+def match_case(replacement, matched):
+    """Give replacement the capitalisation of the text it replaces"""
+    letters = [c for c in matched if c.isalpha()]
+    if len(letters) > 1 and all(c.isupper() for c in letters):
+        return replacement.upper()
+    if matched[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+
+class TextNormalizer:
+    """Every spoken-text rewrite compiled into one regex, applied in a single scan
+
+    Rules match whole words regardless of case. Pronunciation rules always
+    produce their replacement as written; the others follow the case of
+    what they replace, so "I am" and "It is" are contracted too. Extra rules
+    can be added at runtime or from a JSON lexicon ({"phrase": "spoken
+    form"}). Recent results are remembered, since replies repeat a lot.
+    """
+
+    def __init__(self, fixed=None, cased=None, lexicon_path=None, cache_size=512):
+        self.fixed = {}
+        self.cased = {}
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.pattern = None
+        for phrase, spoken in (fixed or {}).items():
+            self.fixed[self.key(phrase)] = spoken
+        for phrase, spoken in (cased or {}).items():
+            self.cased[self.key(phrase)] = spoken
+        if lexicon_path and os.path.exists(lexicon_path):
+            self.load_lexicon(lexicon_path)
+        self.compile()
+
+    @staticmethod
+    def key(phrase):
+        return " ".join(phrase.lower().split())
+
+    def compile(self):
+        phrases = sorted(set(self.fixed) | set(self.cased), key=len, reverse=True)
+        if not phrases:
+            self.pattern = None
+            return
+        # Spaces in a phrase match any run of whitespace; longest phrases win
+        alternatives = "|".join(r"\s+".join(re.escape(word) for word in phrase.split(" ")) for phrase in phrases)
+        self.pattern = re.compile(rf"(?<![\w-])(?:{alternatives})(?![\w-])", re.IGNORECASE)
+        with self.lock:
+            self.cache.clear()
+
+    def add(self, phrase, spoken, keep_case=False):
+        """Add or change one rule; keep_case=True makes it follow the original's case"""
+        target = self.fixed if not keep_case else self.cased
+        target[self.key(phrase)] = spoken
+        (self.cased if not keep_case else self.fixed).pop(self.key(phrase), None)
+        self.compile()
+
+    def load_lexicon(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            for phrase, spoken in json.load(f).items():
+                self.fixed[self.key(phrase)] = spoken
+
+    def _replace(self, match):
+        matched = match.group(0)
+        key = self.key(matched)
+        spoken = self.fixed.get(key)
+        if spoken is not None:
+            return spoken
+        return match_case(self.cased[key], matched)
+
+    def normalize(self, text):
+        with self.lock:
+            cached = self.cache.get(text)
+            if cached is not None:
+                self.cache.move_to_end(text)
+                return cached
+        result = self.pattern.sub(self._replace, text) if self.pattern else text
+        with self.lock:
+            self.cache[text] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return result
+
+
+LEXICON_PATH = os.environ.get("NEXA_LEXICON", "nexa_lexicon.json")
+
+# Name pronunciation only, for the versions that speak replies as written
+PRONUNCIATION = TextNormalizer(PRONUNCIATIONS, lexicon_path=LEXICON_PATH)
+
+# Pronunciation plus contractions, for the natural-sounding voice
+NATURAL_SPEECH = TextNormalizer(PRONUNCIATIONS, CONTRACTIONS, lexicon_path=LEXICON_PATH)
\ No newline at end of file
@@ -0,0 +1,319 @@
+import array
+import json
+import mmap
+import os
+import random
+import sys
+import time
+
+# Intents and replies live in a JSON pack; processes read a compiled copy of it
+PACK_PATH = os.environ.get("NEXA_PACK", os.path.join(os.path.dirname(os.path.abspath(__file__)), "nexa_pack.json"))
+
+MAGIC = b"NEXAPK04"
+TABLE_ARRAYS = ("starts", "chars", "nexts", "fail", "best", "end")
+FUZZY_ARRAYS = ("grams", "gram_starts", "postings", "owners", "limits", "needed")
+SEMANTIC_ARRAYS = ("example_owners",)
+
+
+def uint32_array(values=()):
+    result = array.array("I", values)
+    assert result.itemsize == 4
+    return result
+
+
+def compile_table(table):
+    """Flatten one intent table's automaton into sorted edge arrays
+
+    State s has its edges at starts[s]:starts[s + 1] of chars/nexts,
+    sorted by character so a lookup is a binary search. best is the
+    automaton's priority output; end is the priority of a phrase that ends
+    exactly at a state, which is what early matching needs.
+    """
+    from nexa_intents import NO_MATCH, PhraseAutomaton
+    automaton = PhraseAutomaton(
+        (phrase, priority)
+        for priority, entry in enumerate(table)
+        for phrase in entry["phrases"]
+    )
+    arrays = {name: uint32_array() for name in TABLE_ARRAYS}
+    for state, edges in enumerate(automaton.goto):
+        arrays["starts"].append(len(arrays["chars"]))
+        for ch, nxt in sorted(edges.items(), key=lambda edge: ord(edge[0])):
+            arrays["chars"].append(ord(ch))
+            arrays["nexts"].append(nxt)
+    arrays["starts"].append(len(arrays["chars"]))
+    arrays["fail"].extend(automaton.fail)
+    arrays["best"].extend(automaton.best)
+    end = [NO_MATCH] * len(automaton.goto)
+    for priority, entry in enumerate(table):
+        for phrase in entry["phrases"]:
+            state = 0
+            for ch in phrase:
+                state = automaton.goto[state][ch]
+            end[state] = min(end[state], priority)
+    arrays["end"].extend(end)
+    return arrays
+
+
+def compile_fuzzy(table):
+    """Character-trigram index over the phrases of a table that allow typos
+
+    grams is every distinct trigram code, sorted; the phrases holding
+    grams[g] are postings[gram_starts[g]:gram_starts[g + 1]]. Phrase i
+    belongs to intent priority owners[i], tolerates limits[i] edits, and
+    cannot be within that many edits of a text sharing fewer than needed[i]
+    of its trigrams (each edit breaks at most three of them). Entries marked
+    "exact" in the pack, and phrases too short to tell a typo from another
+    word (a single word needs FUZZY_MIN_WORD_LENGTH), are left out.
+    """
+    from nexa_intents import FUZZY_MIN_LENGTH, FUZZY_MIN_WORD_LENGTH, edit_limit, trigram_codes
+    phrases = []
+    arrays = {name: uint32_array() for name in FUZZY_ARRAYS}
+    index = {}
+    for priority, entry in enumerate(table):
+        if entry.get("exact"):
+            continue
+        for phrase in entry["phrases"]:
+            if len(phrase) < (FUZZY_MIN_LENGTH if " " in phrase.strip() else FUZZY_MIN_WORD_LENGTH):
+                continue
+            grams = set(trigram_codes(phrase))
+            for gram in grams:
+                index.setdefault(gram, []).append(len(phrases))
+            arrays["owners"].append(priority)
+            arrays["limits"].append(edit_limit(phrase))
+            arrays["needed"].append(max(1, len(grams) - 3 * edit_limit(phrase)))
+            phrases.append(phrase)
+    for gram in sorted(index):
+        arrays["grams"].append(gram)
+        arrays["gram_starts"].append(len(arrays["postings"]))
+        arrays["postings"].extend(index[gram])
+    arrays["gram_starts"].append(len(arrays["postings"]))
+    return arrays, phrases
+
+
+def compile_examples(table):
+    """Phrasings the semantic classifier learns from, with their intent priorities
+
+    Every phrase of an entry plus its "examples", paraphrases that are
+    too loose to be trigger phrases themselves. "exact" entries are left
+    out here too.
+    """
+    owners = uint32_array()
+    examples = []
+    for priority, entry in enumerate(table):
+        if entry.get("exact"):
+            continue
+        for example in entry["phrases"] + entry.get("examples", []):
+            owners.append(priority)
+            examples.append(example)
+    return {"example_owners": owners}, examples
+
+
+def compile_pack(pack, stamp=None):
+    """The binary form of a pack: magic, JSON header, then 4-byte aligned arrays"""
+    sections = []
+    offset = 0
+
+    def add(values):
+        nonlocal offset
+        sections.append(values)
+        position = offset
+        offset += len(values) * 4
+        return [position, len(values)]
+
+    # Strings are one UTF-8 blob; string i is text[bounds[i]:bounds[i + 1]]
+    text = bytearray()
+    bounds = uint32_array([0])
+
+    def add_strings(strings):
+        nonlocal text
+        first = len(bounds) - 1
+        for string in strings:
+            text += string.encode("utf-8")
+            bounds.append(len(text))
+        return [first, len(strings)]
+
+    header = {"stamp": stamp, "byteorder": sys.byteorder, "tables": {}, "responses": {}, "phrases": 0}
+    for name, spec in pack.get("intents", {}).items():
+        arrays = compile_table(spec["table"])
+        fuzzy, phrases = compile_fuzzy(spec["table"])
+        semantic, examples = compile_examples(spec["table"])
+        arrays.update(fuzzy)
+        arrays.update(semantic)
+        header["tables"][name] = {
+            "names": [entry["intent"] for entry in spec["table"]],
+            "early": list(spec.get("early", ())),
+            "arrays": {key: add(arrays[key]) for key in TABLE_ARRAYS + FUZZY_ARRAYS + SEMANTIC_ARRAYS},
+            "fuzzy_phrases": add_strings(phrases),
+            "examples": add_strings(examples),
+        }
+        header["phrases"] += sum(len(entry["phrases"]) for entry in spec["table"])
+
+    for group, keys in pack.get("responses", {}).items():
+        for key, replies in keys.items():
+            header["responses"][f"{group}.{key}"] = add_strings(replies)
+    header["bounds"] = add(bounds)
+    header["text"] = [offset, len(text)]
+
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    prefix = MAGIC + len(encoded).to_bytes(4, "little") + encoded
+    prefix += b"\0" * (-len(prefix) % 4)
+    return prefix + b"".join(section.tobytes() for section in sections) + bytes(text)
+
+
+class IntentTable:
+    """One compiled intent table, backed by memoryviews into the pack"""
+
+    def __init__(self, spec, arrays, string_at):
+        self.names = spec["names"]
+        self.early = frozenset(spec["early"])
+        for key in TABLE_ARRAYS + FUZZY_ARRAYS + SEMANTIC_ARRAYS:
+            setattr(self, key, arrays[key])
+        self.spec = spec
+        self.string_at = string_at
+
+    def phrase_at(self, index):
+        """Text of fuzzy phrase index, decoded only when it is a candidate"""
+        return self.string_at(self.spec["fuzzy_phrases"][0] + index)
+
+    def examples(self):
+        """Every example phrasing, in example_owners order"""
+        first, count = self.spec["examples"]
+        return [self.string_at(index) for index in range(first, first + count)]
+
+
+class Catalog:
+    """Intent tables and reply lists read straight out of a compiled pack
+
+    Nothing is unpacked on load: arrays are memoryviews over the buffer
+    (normally an mmap of the cache file, shared by every process that maps
+    it) and replies are decoded only when one is picked.
+    """
+
+    def __init__(self, buffer, source=None):
+        self.buffer = buffer
+        self.source = source
+        view = memoryview(buffer)
+        length = int.from_bytes(view[8:12], "little")
+        self.header = json.loads(bytes(view[12:12 + length]))
+        base = 12 + length + (-(12 + length) % 4)
+        self.data = view[base:]
+        self.bounds = self.array(self.header["bounds"])
+        start, size = self.header["text"]
+        self.text = self.data[start:start + size]
+
+    def array(self, span):
+        offset, count = span
+        return self.data[offset:offset + count * 4].cast("I")
+
+    @property
+    def phrase_count(self):
+        return self.header["phrases"]
+
+    def table(self, name):
+        spec = self.header["tables"][name]
+        return IntentTable(spec, {key: self.array(span) for key, span in spec["arrays"].items()}, self.reply_at)
+
+    def replies(self, key):
+        """Every reply stored under a key such as real_voice.time"""
+        first, count = self.header["responses"][key]
+        return [self.reply_at(index) for index in range(first, first + count)]
+
+    def reply_at(self, index):
+        """String index of the blob: a reply, a fuzzy phrase or an example"""
+        return str(self.text[self.bounds[index]:self.bounds[index + 1]], "utf-8")
+
+    def reply(self, key, **fields):
+        """One reply picked at random, with {placeholders} filled from fields"""
+        first, count = self.header["responses"][key]
+        text = self.reply_at(first + random.randrange(count))
+        return text.format(**fields) if fields else text
+
+
+def cache_path(pack_path):
+    """Compiled copy next to the pack, or in the temp dir if that is read-only"""
+    path = os.environ.get("NEXA_PACK_CACHE")
+    if path:
+        return path
+    base = os.path.splitext(pack_path)[0] + ".bin"
+    if os.access(os.path.dirname(base) or ".", os.W_OK):
+        return base
+    # Only needed off the usual path, so not imported at startup
+    import hashlib
+    import tempfile
+    digest = hashlib.sha1(os.path.abspath(pack_path).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"nexa_pack_{digest}.bin")
+
+
+def map_cache(path, stamp):
+    """mmap a compiled pack if it exists and was built from this exact source"""
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        if mapped[:8] == MAGIC:
+            # Checked on plain bytes: the map cannot be closed once views of it exist
+            length = int.from_bytes(mapped[8:12], "little")
+            header = json.loads(mapped[12:12 + length])
+            if header["stamp"] == stamp and header["byteorder"] == sys.byteorder:
+                return Catalog(mapped, path)
+    except (ValueError, KeyError):
+        pass
+    mapped.close()
+    return None
+
+
+def build_cache(pack_path, path, stamp):
+    with open(pack_path, "r", encoding="utf-8") as f:
+        data = compile_pack(json.load(f), stamp)
+    try:
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except OSError:
+        # Still usable, just not shared with other processes
+        return Catalog(data)
+    return map_cache(path, stamp) or Catalog(data)
+
+
+def load_catalog(pack_path=PACK_PATH):
+    """Map the compiled pack, recompiling it first if the JSON changed"""
+    info = os.stat(pack_path)
+    stamp = [info.st_size, info.st_mtime_ns]
+    path = cache_path(pack_path)
+    return map_cache(path, stamp) or build_cache(pack_path, path, stamp)
+
+
+_catalog = None
+
+
+def get_catalog():
+    """The process-wide catalog, loaded on first use"""
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog()
+    return _catalog
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Compile the NEXA intent and reply pack")
+    parser.add_argument("pack", nargs="?", default=PACK_PATH, help="pack JSON to compile")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    path = cache_path(args.pack)
+    if os.path.exists(path):
+        os.unlink(path)
+    catalog = load_catalog(args.pack)
+    seconds = time.perf_counter() - start
+    print(f"📦 {catalog.phrase_count} phrases in {len(catalog.header['tables'])} tables, "
+          f"{len(catalog.header['responses'])} reply lists -> {path} "
+          f"({len(catalog.buffer)} bytes, {seconds * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
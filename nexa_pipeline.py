@@ -0,0 +1,201 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from nexa_metrics import METRICS
+
+
+class Turn:
+    """One utterance on its way through the pipeline"""
+
+    def __init__(self, number, audio):
+        self.number = number
+        self.audio = audio
+        self.text = None
+        self.response = None
+        self.tone = None
+        self.final = False
+        self.speech = None
+        self.captured = time.perf_counter()
+        self.timings = {}
+
+
+class ConversationPipeline:
+    """Event-driven conversation core: capture -> recognition -> intent -> synthesis -> playback
+
+    Every stage runs as its own task and hands turns on through a small bounded
+    queue, so the microphone is listening again while the last reply is still
+    being recognized, synthesized or played. With barge-in on (NEXA_BARGE_IN=1,
+    for headphones) new speech during playback cuts the current reply and
+    drops replies still queued for older turns. Off, which is the default, a
+    phrase that began while a reply was playing (or just after) is taken for
+    NEXA's own voice coming back through the speakers and ignored.
+
+    If any stage fails, run() stops the others and raises that error.
+
+    The stage callables are plain blocking functions and run in worker threads:
+        capture() -> audio or None
+        recognize(audio) -> text or None
+        respond(text) -> (response, tone, final)
+        synthesize(response, tone) -> speech
+        play(speech)
+        stop_playback()
+    """
+
+    def __init__(self, capture, recognize, respond, synthesize, play, stop_playback=None, queue_size=2,
+                 barge_in=None, echo_tail=0.3):
+        self.capture = capture
+        self.recognize = recognize
+        self.respond = respond
+        self.synthesize = synthesize
+        self.play = play
+        self.stop_playback = stop_playback
+        self.queue_size = queue_size
+        self.turn_count = 0
+        self.cancel_before = 0
+        self.playing = None
+        self.barge_ins = 0
+        if barge_in is None:
+            barge_in = os.environ.get("NEXA_BARGE_IN", "0") == "1"
+        self.allow_barge_in = barge_in
+        self.echo_tail = echo_tail
+        self.played_until = 0.0
+        self.echoes = 0
+        self.turn_latencies = []
+        self.finished = None
+
+    async def _in_thread(self, pool, func, *args):
+        start = time.perf_counter()
+        result = await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+        return result, time.perf_counter() - start
+
+    def _cancelled(self, turn):
+        return turn.number < self.cancel_before
+
+    async def _capture_stage(self, out):
+        while not self.finished.is_set():
+            audio, elapsed = await self._in_thread(self.capture_pool, self.capture)
+            if audio is None:
+                # Timeouts already waited; this just keeps a broken device from spinning
+                await asyncio.sleep(0.1)
+                continue
+            if not self.allow_barge_in and self.heard_during_playback(audio):
+                self.echoes += 1
+                METRICS.count("pipeline_echo_dropped")
+                continue
+            self.turn_count += 1
+            turn = Turn(self.turn_count, audio)
+            turn.timings["capture"] = elapsed
+            if self.playing is not None:
+                self.barge_in(turn)
+            await out.put(turn)
+
+    def heard_during_playback(self, audio):
+        """Whether a phrase began while a reply was playing or within echo_tail after it"""
+        if self.playing is not None:
+            return True
+        duration = audio.duration() if hasattr(audio, "duration") else 0.0
+        return time.perf_counter() - duration < self.played_until + self.echo_tail
+
+    async def _recognize_turn(self, turn):
+        turn.text, turn.timings["recognition"] = await self._in_thread(self.pool, self.recognize, turn.audio)
+        return turn
+
+    async def _recognition_stage(self, inbox, decoding):
+        # Several utterances may decode at once; replies still go out in order
+        while True:
+            turn = await inbox.get()
+            await decoding.put(asyncio.create_task(self._recognize_turn(turn)))
+
+    async def _ordering_stage(self, decoding, out):
+        while True:
+            turn = await (await decoding.get())
+            if turn.text:
+                await out.put(turn)
+
+    async def _intent_stage(self, inbox, out):
+        while True:
+            turn = await inbox.get()
+            start = time.perf_counter()
+            turn.response, turn.tone, turn.final = self.respond(turn.text)
+            turn.timings["intent"] = time.perf_counter() - start
+            await out.put(turn)
+
+    async def _synthesis_stage(self, inbox, out):
+        while True:
+            turn = await inbox.get()
+            if self._cancelled(turn):
+                continue
+            turn.speech, turn.timings["synthesis"] = await self._in_thread(
+                self.pool, self.synthesize, turn.response, turn.tone
+            )
+            await out.put(turn)
+
+    async def _playback_stage(self, inbox):
+        while True:
+            turn = await inbox.get()
+            if self._cancelled(turn):
+                continue
+            self.playing = turn
+            self.turn_latencies.append(time.perf_counter() - turn.captured)
+            try:
+                _, turn.timings["playback"] = await self._in_thread(self.playback_pool, self.play, turn.speech)
+            finally:
+                self.playing = None
+                self.played_until = time.perf_counter()
+            for stage, seconds in turn.timings.items():
+                METRICS.observe(f"pipeline_{stage}", seconds)
+            METRICS.add_trace(turn.number, turn.timings)
+            if turn.final and not self._cancelled(turn):
+                self.finished.set()
+                return
+
+    def barge_in(self, turn):
+        """The user spoke over a reply: stop it and forget replies to older turns"""
+        self.barge_ins += 1
+        self.cancel_before = turn.number
+        print("✋ Barge-in - stopping the current reply")
+        if self.stop_playback:
+            self.stop_playback()
+
+    async def run(self):
+        self.finished = asyncio.Event()
+        self.capture_pool = ThreadPoolExecutor(1, thread_name_prefix="nexa-capture")
+        self.playback_pool = ThreadPoolExecutor(1, thread_name_prefix="nexa-playback")
+        self.pool = ThreadPoolExecutor(4, thread_name_prefix="nexa-stage")
+        audio, decoding, text, replies, speech = (asyncio.Queue(self.queue_size) for _ in range(5))
+        tasks = [
+            asyncio.create_task(self._capture_stage(audio)),
+            asyncio.create_task(self._recognition_stage(audio, decoding)),
+            asyncio.create_task(self._ordering_stage(decoding, text)),
+            asyncio.create_task(self._intent_stage(text, replies)),
+            asyncio.create_task(self._synthesis_stage(replies, speech)),
+            asyncio.create_task(self._playback_stage(speech)),
+        ]
+        finishing = asyncio.create_task(self.finished.wait())
+        try:
+            # A stage only ever stops by failing (or playback, once the chat is over)
+            done, _ = await asyncio.wait(tasks + [finishing], return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                if task in done and not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            finishing.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # A capture may still be blocked on the microphone; don't wait for it
+            for pool in (self.capture_pool, self.pool, self.playback_pool):
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        latencies = sorted(self.turn_latencies)
+        if not latencies:
+            return {"turns": 0, "barge_ins": self.barge_ins, "echoes": self.echoes}
+        return {
+            "turns": len(latencies),
+            "barge_ins": self.barge_ins,
+            "echoes": self.echoes,
+            "median_latency": latencies[len(latencies) // 2],
+            "max_latency": latencies[-1],
+        }
\ No newline at end of file
@@ -1,147 +1,257 @@
-import speech_recognition as sr
-import subprocess
-import tempfile
-import os
 from datetime import datetime, timedelta
 import random
 import time
 import json
+import os
+import sys
+import concurrent.futures
+from nexa_intents import CATALOG, REAL_VOICE_MATCHER, REAL_VOICE_EXIT_MATCHER
+from nexa_tts import get_speech_worker
+from nexa_capture import AudioCapture, open_audio_source
+from nexa_recognition import RecognitionPool, RecognitionBusy
+from nexa_startup import StartupTasks, WarmState
+from nexa_sessions import SessionState, session_field
+from nexa_metrics import METRICS, start_metrics_export
+from nexa_normalizer import NATURAL_SPEECH
 
 class NEXA_Real_Voice:
-    def __init__(self):
+    # Per-user state lives in one compact session record that a server can swap
+    user_name = session_field("user_name")
+    voice_index = session_field("voice_index")
+    conversation_context = session_field("conversation_context")
+    
+    def __init__(self, audio_source=None, recognizer_backend=None, state_path="nexa_state.json", wake_word=None, recorder=None):
         print("🔊 NEXA with NATURAL Voice Recognition - Python 3.11")
-        self.voice_index = 1
-        self.recognizer = sr.Recognizer()
-        self.user_name = None
+        self.session = SessionState("local")
+        # Settings saved by the last run; with them the start is warm
+        self.state = WarmState(state_path)
+        self.voice_index = self.state.get("voice_index", 1)
+        self.user_name = self.state.get("user_name")
         self.conversation_context = {}
-        self.setup_microphone()
+        self.audio_capture = AudioCapture(
+            audio_source or open_audio_source(),
+            energy_threshold=self.state.get("energy_threshold", 300),
+        )
+        self.recognition = RecognitionPool(recognizer_backend)
+        # None: follow NEXA_WAKE; True/False: always/never wait for "Nexa"
+        self.wake_word = wake_word
+        self.wake_gate = None
+        # What the current turn heard and understood, for the session recorder
+        self.last_audio = None
+        self.last_intent = None
+        self.recorder = recorder
+        if recorder:
+            recorder.begin(
+                user_name=self.user_name,
+                voice_index=self.voice_index,
+                energy_threshold=self.audio_capture.energy_threshold,
+            )
+        
+        # Microphone, speech engine and recognizer come up side by side in the background
+        self.startup = StartupTasks()
+        self.startup.launch("microphone", self.setup_microphone)
+        self.startup.launch("speech", self.warm_up_speech)
+        if hasattr(self.recognition.backend, "load"):
+            self.startup.launch("recognizer", self.recognition.backend.load)
         
     def setup_microphone(self):
-        """Setup microphone for real voice input"""
+        """Open the input stream once for the whole session"""
         try:
             print("🎤 Initializing microphone...")
-            with sr.Microphone() as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+            # The noise level is tracked from the live stream from here on
+            self.audio_capture.start()
+            self.start_wake_gate()
             print("✅ Microphone ready for NATURAL conversations!")
         except Exception as e:
             print(f"❌ Microphone setup failed: {e}")
             return False
         return True
     
+    def warm_up_speech(self):
+        """Start the speech engine before the first reply needs it"""
+        get_speech_worker().start()
+    
+    def start_wake_gate(self):
+        """Only pass phrases on to recognition after "Nexa", when enabled and enrolled"""
+        from nexa_wake import open_wake_gate, wake_word_enabled
+        if not (wake_word_enabled() if self.wake_word is None else self.wake_word):
+            return
+        self.wake_gate = open_wake_gate(self.audio_capture, on_wake=self.on_wake)
+        if self.wake_gate is None:
+            print("⚠️ No wake-word samples yet - run: python nexa_wake.py enroll")
+            return
+        self.wake_gate.start()
+        print('👂 Say "Nexa" when you want me')
+    
+    def on_wake(self, score):
+        print(f"✨ Yes? I'm listening (wake word match {score:.2f})")
+    
+    def report_wake_word(self):
+        if not self.wake_gate:
+            return
+        report = self.wake_gate.report()
+        print(f"👂 Wake word: {report['phrases']} phrases heard, {report['wakes']} wake-ups, "
+              f"{report['rejected']} ignored, {report['false_accepts']} false accepts, "
+              f"{report['over_budget']} skipped over budget, CPU {report['cpu_share'] * 100:.2f}% of a core")
+    
+    def remember_noise_level(self):
+        """Save the tracked threshold once it has drifted, so the next start begins there"""
+        threshold = round(self.audio_capture.energy_threshold)
+        saved = self.state.get("energy_threshold")
+        if saved is None or abs(threshold - saved) > 0.2 * saved:
+            self.state.save(energy_threshold=threshold)
+    
+    def wait_until_ready(self):
+        """Block until the microphone is open"""
+        return self.startup.wait("microphone")
+    
     def get_time_based_greeting(self):
         """Get appropriate greeting based on time of day"""
         current_hour = datetime.now().hour
         
         if 5 <= current_hour < 12:
-            return random.choice([
-                "Good morning! I hope you're starting your day well!",
-                "Morning! Ready for a great day ahead?",
-                "Hello there! What a beautiful morning to chat!"
-            ])
+            return CATALOG.reply("real_voice.greeting_morning")
         elif 12 <= current_hour < 17:
-            return random.choice([
-                "Good afternoon! How's your day going so far?",
-                "Afternoon! Hope you're having a productive day!",
-                "Hello! Lovely afternoon for a conversation, isn't it?"
-            ])
+            return CATALOG.reply("real_voice.greeting_afternoon")
         elif 17 <= current_hour < 21:
-            return random.choice([
-                "Good evening! How was your day?",
-                "Evening! Perfect time to relax and chat!",
-                "Hello! Hope you had a wonderful evening so far!"
-            ])
+            return CATALOG.reply("real_voice.greeting_evening")
         else:
-            return random.choice([
-                "Hello! Still up and about I see!",
-                "Hi there! Late night conversations are the best!",
-                "Hello! Working late or just enjoying the night?"
-            ])
+            return CATALOG.reply("real_voice.greeting_night")
     
+    @METRICS.timed("listen")
     def listen(self):
         """Natural voice listening with better feedback"""
+        audio = self.capture()
+        self.last_audio = audio
+        if audio is None:
+            return None
+        return self.recognize(audio)
+    
+    @METRICS.timed("capture")
+    def capture(self):
+        """Cut the next phrase out of the always-open input stream"""
+        self.wait_until_ready()
         try:
             print("\n🎤 Listening... (Speak naturally)")
             
-            with sr.Microphone() as source:
-                # More natural timeout for conversations
-                audio = self.recognizer.listen(source, timeout=15, phrase_time_limit=8)
+            # Partial transcripts, when the recognizer can stream them
+            stream = None
+            if not self.wake_gate:
+                stream = self.recognition.stream(self.audio_capture.sample_rate, self.audio_capture.sample_width)
+            heard = None
+            early = None
             
-            print("🔍 Understanding your words...")
-            command = self.recognizer.recognize_google(audio).lower()
+            def on_frame(frame):
+                nonlocal heard, early
+                partial = stream.feed(frame)
+                if not partial or partial.lower() == heard:
+                    return False
+                heard = partial.lower()
+                print(f"💭 Hearing: '{heard}'...")
+                # Confident short commands are answered without waiting for the pause
+                if REAL_VOICE_MATCHER.match_early(heard):
+                    early = heard
+                    print("⚡ Got it - answering right away")
+                    return True
+                return False
+            
+            # More natural timeout for conversations
+            if self.wake_gate:
+                # The gate's thread does the listening; only phrases after "Nexa" arrive
+                utterance = self.wake_gate.next_command(timeout=15)
+            else:
+                utterance = self.audio_capture.next_utterance(
+                    timeout=15, phrase_time_limit=8, on_frame=on_frame if stream else None
+                )
+            self.remember_noise_level()
+            if utterance is None:
+                print("⏰ Listening for your voice...")
+                METRICS.count("listen_timeouts")
+                return None
+            if stream:
+                utterance.transcript = early or stream.finish()
+            return utterance
+            
+        except Exception as e:
+            print(f"🎤 Listening error: {e}")
+            return None
+    
+    @METRICS.timed("recognize")
+    def recognize(self, audio):
+        """Turn captured audio into lowercase text"""
+        try:
+            command = getattr(audio, "transcript", None)
+            if not command:
+                print("🔍 Understanding your words...")
+                command = self.recognition.recognize(audio)
+            if not command:
+                print("❌ Couldn't catch that clearly")
+                METRICS.count("recognition_not_understood")
+                if self.wake_gate and getattr(audio, "wake_score", None) is not None:
+                    self.wake_gate.false_accept()
+                return None
+            command = command.lower()
             print(f"👂 Heard: '{command}'")
             return command
             
-        except sr.WaitTimeoutError:
-            print("⏰ Listening for your voice...")
+        except concurrent.futures.TimeoutError:
+            print("⏰ Recognition took too long")
+            METRICS.count("recognition_timeouts")
             return None
-        except sr.UnknownValueError:
-            print("❌ Couldn't catch that clearly")
+        except RecognitionBusy:
+            print("⏰ The recognizer is still stuck on earlier phrases")
+            METRICS.count("recognition_busy")
             return None
         except Exception as e:
             print(f"🎤 Listening error: {e}")
             return None
     
-    def speak(self, text, emotional_tone="neutral"):
-        """More natural speaking with emotional tones"""
-        # Remove any spelling out of NEXA - let it pronounce naturally as "nexa"
-        text = text.replace("N E X A", "NEX-uh")
-        text = text.replace("N-E-X-A", "NEX-uh")
-        
+    @METRICS.timed("speak")
+    def speak(self, text, emotional_tone="neutral", stream=None):
+        """More natural speaking with emotional tones
+
+        stream=True starts playing the first sentence while the rest is
+        still being synthesized (on by default, NEXA_TTS_STREAM=0 turns it off).
+        """
+        natural_text, voice_rate = self.prepare_speech(text, emotional_tone)
+        get_speech_worker().say(natural_text, self.voice_index, voice_rate, stream=stream)
+    
+    def prepare_speech(self, text, emotional_tone="neutral"):
+        """Final spoken text and SAPI rate for a reply"""
         # Add natural pauses and phrasing
         natural_text = self.make_speech_natural(text, emotional_tone)
         print(f"🤖 NEXA: {natural_text}")
         
         # Adjust voice based on emotional tone
         voice_rate = self.get_voice_rate(emotional_tone)
-        
-        vb_script = f'''
-Dim speech
-Set speech = CreateObject("SAPI.SpVoice")
-If speech.GetVoices.Count > {self.voice_index} Then
-    Set speech.Voice = speech.GetVoices.Item({self.voice_index})
-End If
-speech.Rate = {voice_rate}
-speech.Speak "{natural_text.replace('"', "'")}"
-'''
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.vbs', delete=False) as f:
-            f.write(vb_script)
-            temp_file = f.name
-        
-        try:
-            subprocess.run(['cscript', '//B', '//Nologo', temp_file], timeout=20)
-        except:
-            pass
-        finally:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+        return natural_text, voice_rate
+    
+    def synthesize(self, text, emotional_tone="neutral"):
+        """Render a reply to audio without playing it"""
+        natural_text, voice_rate = self.prepare_speech(text, emotional_tone)
+        return get_speech_worker().render(natural_text, self.voice_index, voice_rate)
     
+    def set_voice(self, voice_index):
+        """Switch to another SAPI voice and drop speech cached for the old one"""
+        cache = get_speech_worker().cache
+        if cache:
+            cache.invalidate(self.voice_index)
+        self.voice_index = voice_index
+        self.state.save(voice_index=voice_index)
+    
+    @METRICS.timed("make_speech_natural")
     def make_speech_natural(self, text, tone):
         """Make the speech sound more human-like"""
-        # Remove robotic phrasing
-        natural_replacements = {
-            "i am": "I'm",
-            "it is": "it's",
-            "i will": "I'll",
-            "do not": "don't",
-            "cannot": "can't",
-            "i have": "I've",
-            "you are": "you're",
-            "what is": "what's"
-        }
-        
-        for formal, natural in natural_replacements.items():
-            text = text.replace(formal, natural)
+        # Say NEXA naturally and remove robotic phrasing, all in one pass
+        text = NATURAL_SPEECH.normalize(text)
         
         # Add emotional markers
         if tone == "friendly":
-            text = random.choice(["Hey there! ", "You know, ", "Well, ", "So, "]) + text
+            text = CATALOG.reply("real_voice.opener_friendly") + text
         elif tone == "excited":
-            text = random.choice(["Wow! ", "Awesome! ", "Cool! "]) + text
+            text = CATALOG.reply("real_voice.opener_excited") + text
         elif tone == "calm":
-            text = text + random.choice([". No worries.", ". Take your time."])
+            text = text + CATALOG.reply("real_voice.closer_calm")
             
         return text
     
@@ -156,32 +266,27 @@ speech.Speak "{natural_text.replace('"', "'")}"
         }
         return rates.get(tone, 0)
     
+    @METRICS.timed("process_command")
     def process_command(self, command):
         """Process natural voice commands with context"""
         if not command:
             return "I'm listening... go ahead and speak.", "calm"
         
         command_lower = command.lower()
+        intent = REAL_VOICE_MATCHER.match(command_lower)
+        self.last_intent = intent
         
+        # Replies come from nexa_pack.json; {placeholders} are filled in here
         # Greetings with context awareness
-        if any(word in command_lower for word in ['hello', 'hi', 'hey', 'nexa', 'wake up', 'good morning', 'good afternoon', 'good evening']):
+        if intent == "greeting":
             if not self.user_name:
-                responses = [
-                    f"{self.get_time_based_greeting()} What should I call you?",
-                    f"{self.get_time_based_greeting()} Mind telling me your name?",
-                    f"{self.get_time_based_greeting()} I'm NEX-uh. What's your name?"
-                ]
-                return random.choice(responses), "friendly"
+                return CATALOG.reply("real_voice.greeting_stranger", greeting=self.get_time_based_greeting()), "friendly"
             else:
-                responses = [
-                    f"{self.get_time_based_greeting()} {self.user_name}!",
-                    f"Hey {self.user_name}! {self.get_time_based_greeting()}",
-                    f"Hi {self.user_name}! {self.get_time_based_greeting().lower()}"
-                ]
-                return random.choice(responses), "excited"
+                greeting = self.get_time_based_greeting()
+                return CATALOG.reply("real_voice.greeting_known", greeting=greeting, greeting_lower=greeting.lower(), name=self.user_name), "excited"
         
         # Name recognition
-        elif any(word in command_lower for word in ['my name is', 'call me', 'i am', 'this is']):
+        elif intent == "name":
             if 'my name is' in command_lower:
                 name = command_lower.split('my name is')[-1].strip()
             elif 'call me' in command_lower:
@@ -194,214 +299,173 @@ speech.Speak "{natural_text.replace('"', "'")}"
                 name = command_lower
             
             self.user_name = name.split()[0].title()  # Take first name only
-            responses = [
-                f"Nice to meet you, {self.user_name}! Your voice is crystal clear.",
-                f"Got it, {self.user_name}! I'll remember that name.",
-                f"Hello {self.user_name}! That's a great name. How can I help you today?",
-                f"Pleased to meet you, {self.user_name}! Ready to chat?"
-            ]
-            return random.choice(responses), "friendly"
+            self.state.save(user_name=self.user_name)
+            return CATALOG.reply("real_voice.name", name=self.user_name), "friendly"
         
         # Time with natural phrasing - MULTIPLE WAYS TO ASK
-        elif any(phrase in command_lower for phrase in [
-            'what time is it', 'what\'s the time', 'current time', 'time please',
-            'can you tell me the time', 'do you have the time', 'what time do you have',
-            'time now', 'what is the time', 'could you tell me the time'
-        ]):
+        elif intent == "time":
             current_time = datetime.now().strftime('%I:%M %p').lstrip('0')
-            time_responses = [
-                f"It's currently {current_time}",
-                f"Right now it's {current_time}",
-                f"The time is {current_time}",
-                f"My clock shows {current_time}",
-                f"It's {current_time} at the moment",
-                f"Let me check... it's {current_time} now"
-            ]
-            return random.choice(time_responses), "neutral"
+            return CATALOG.reply("real_voice.time", time=current_time), "neutral"
         
         # Date with natural phrasing - MULTIPLE WAYS TO ASK
-        elif any(phrase in command_lower for phrase in [
-            'what date is it', 'what\'s the date', 'current date', 'date today',
-            'what day is it', 'what is today', 'can you tell me the date',
-            'what\'s today\'s date', 'which day is today', 'what is the date today'
-        ]):
+        elif intent == "date":
             current_date = datetime.now().strftime('%A, %B %d, %Y')
-            date_responses = [
-                f"Today is {current_date}",
-                f"It's {current_date} today",
-                f"We're on {current_date}",
-                f"According to my calendar, it's {current_date}",
-                f"Today we have {current_date}",
-                f"It's {current_date} right now"
-            ]
-            return random.choice(date_responses), "neutral"
+            return CATALOG.reply("real_voice.date", date=current_date), "neutral"
         
         # Day of week specifically
-        elif any(phrase in command_lower for phrase in [
-            'what day is today', 'which day is it', 'what day of the week'
-        ]):
+        elif intent == "day":
             day_name = datetime.now().strftime('%A')
-            responses = [
-                f"Today is {day_name}",
-                f"It's {day_name} today",
-                f"We're on {day_name}",
-                f"Today is {day_name}, my friend"
-            ]
-            return random.choice(responses), "friendly"
+            return CATALOG.reply("real_voice.day", day=day_name), "friendly"
         
         # Jokes with personality
-        elif any(word in command_lower for word in ['joke', 'funny', 'make me laugh', 'tell me a joke']):
-            jokes = [
-                "Why don't scientists trust atoms? Because they make up everything!",
-                "I told my computer I needed a break, and it said 'Sorry, I'm busy processing your request to be lazy!'",
-                "Why do programmers prefer dark mode? Because light attracts bugs!",
-                "What's a computer's favorite beat? An algorithm!",
-                "Why was the smartphone so smart? It had too many connections!",
-                "Why did the computer go to the doctor? It had a virus!",
-                "What do you call a sleeping computer? A laptop!",
-                "Why was the computer cold? It left its Windows open!"
-            ]
-            setup = random.choice(["Sure! Here's one: ", "Let me tell you a funny one: ", "I've got a good one: ", "Okay, this always makes me laugh: "])
-            return setup + random.choice(jokes), "excited"
+        elif intent == "joke":
+            return CATALOG.reply("real_voice.joke_setup") + CATALOG.reply("real_voice.joke"), "excited"
         
         # Weather (simulated)
-        elif any(word in command_lower for word in ['weather', 'temperature', 'outside', 'how hot', 'how cold']):
-            weather_types = ["sunny", "cloudy", "partly cloudy", "clear", "breezy"]
+        elif intent == "weather":
             temp = random.randint(65, 85)
-            weather = random.choice(weather_types)
-            responses = [
-                f"Looks like it's {temp} degrees and {weather} outside",
-                f"I'd say it's about {temp} degrees with {weather} skies",
-                f"The weather appears to be {temp} degrees and {weather}",
-                f"From what I can tell, it's {temp} and {weather} out there",
-                f"Seems like {temp} degrees with {weather} conditions today"
-            ]
-            return random.choice(responses), "neutral"
+            weather = CATALOG.reply("real_voice.weather_kind")
+            return CATALOG.reply("real_voice.weather", temp=temp, weather=weather), "neutral"
         
         # How are you responses
-        elif any(word in command_lower for word in ['how are you', 'how do you feel', 'how is it going']):
-            responses = [
-                "I'm functioning perfectly! Your voice is coming through crystal clear.",
-                "I'm great! Real voice recognition makes this so much more natural, don't you think?",
-                "I'm doing well! It's much nicer talking like this instead of typing.",
-                "I'm excellent! Hearing your actual voice is working beautifully.",
-                "I'm fantastic! This voice chat is going smoothly, isn't it?"
-            ]
-            return random.choice(responses), "friendly"
+        elif intent == "how_are_you":
+            return CATALOG.reply("real_voice.how_are_you"), "friendly"
         
         # Thank you responses
-        elif any(word in command_lower for word in ['thank you', 'thanks', 'appreciate it']):
-            responses = [
-                "You're very welcome! This voice interaction is working perfectly.",
-                "Anytime! It's great to help you with real conversations.",
-                "No problem at all! I'm glad the voice recognition is working so well.",
-                "You're welcome! Happy to assist with genuine conversations.",
-                "My pleasure! It's wonderful chatting with you like this."
-            ]
-            return random.choice(responses), "friendly"
+        elif intent == "thanks":
+            return CATALOG.reply("real_voice.thanks"), "friendly"
         
         # Compliments
-        elif any(word in command_lower for word in ['you are smart', 'you are intelligent', 'good job', 'well done']):
-            responses = [
-                "Thank you! I'm learning from our conversations.",
-                "You're making me blush! Well, if I could blush...",
-                "Thanks! It's all thanks to clear voice commands like yours.",
-                "I appreciate that! Our voice chat is working great, isn't it?",
-                "Thank you! I'm just trying to keep up with you!"
-            ]
-            return random.choice(responses), "excited"
+        elif intent == "compliment":
+            return CATALOG.reply("real_voice.compliment"), "excited"
         
         # Who are you questions
-        elif any(phrase in command_lower for phrase in ['who are you', 'what are you', 'tell me about yourself']):
-            responses = [
-                "I'm NEX-uh, your voice assistant with real speech recognition! I'm here to have natural conversations with you.",
-                "I'm NEX-uh! A voice AI that actually listens to your real voice and responds naturally. No typing needed!",
-                "I'm NEX-uh, your conversational AI partner. I use genuine voice recognition to understand you and chat like a real person!",
-                "I'm NEX-uh - your voice-enabled assistant. The cool part is I understand your actual speech, not just typed commands!"
-            ]
-            return random.choice(responses), "friendly"
+        elif intent == "who_are_you":
+            return CATALOG.reply("real_voice.who_are_you"), "friendly"
         
         # What can you do
-        elif any(phrase in command_lower for phrase in ['what can you do', 'what can i ask', 'how can you help']):
-            responses = [
-                "I can tell you the time, date, weather, tell jokes, remember your name, and have natural conversations with you! Just speak naturally.",
-                "Lots of things! I can chat about time, dates, weather, tell funny jokes, and remember details like your name. Try asking me anything naturally!",
-                "I'm here for natural conversations! Ask me about the time, what day it is, the weather, or for a joke. I'll remember your name and we can chat like friends!"
-            ]
-            return random.choice(responses), "excited"
+        elif intent == "capabilities":
+            return CATALOG.reply("real_voice.capabilities"), "excited"
         
         # Reminders with natural language
-        elif any(word in command_lower for word in ['remind me', 'remember this', 'don\'t forget']):
-            responses = [
-                "I'm listening. What would you like me to remember?",
-                "Go ahead, tell me what to remind you about.",
-                "I've got my memory ready. What's the reminder?",
-                "Sure thing! What should I remember for you?"
-            ]
-            return random.choice(responses), "calm"
+        elif intent == "reminder":
+            return CATALOG.reply("real_voice.reminder"), "calm"
         
         # Goodbye with context
-        elif any(word in command_lower for word in ['bye', 'goodbye', 'see you', 'stop', 'exit', 'quit', 'good night']):
+        elif intent == "goodbye":
             if self.user_name:
-                responses = [
-                    f"Goodbye {self.user_name}! This voice chat was wonderful!",
-                    f"See you later {self.user_name}! The voice recognition worked perfectly!",
-                    f"Bye {self.user_name}! Can't wait for our next real conversation!",
-                    f"Bye {self.user_name}! This was a great chat!",
-                    f"Take care {self.user_name}! Until we speak again!"
-                ]
-            else:
-                responses = [
-                    "Goodbye! This genuine voice interaction was amazing!",
-                    "See you later! The real voice recognition worked flawlessly!",
-                    "Bye! Can't wait for our next proper conversation!",
-                    "Bye! This voice chat was fantastic!",
-                    "Take care! It was wonderful talking with you!"
-                ]
-            return random.choice(responses), "friendly"
+                return CATALOG.reply("real_voice.goodbye_known", name=self.user_name), "friendly"
+            return CATALOG.reply("real_voice.goodbye"), "friendly"
         
         # Default response for unknown commands
         else:
-            responses = [
-                f"I heard '{command}'. That's interesting! Try asking about time, date, weather, or tell me a joke.",
-                f"You said '{command}'. I'm still learning natural conversations. You can ask me simple things like what time it is or to tell a joke.",
-                f"I understood '{command}'. For now, I'm best with simple conversations like greetings, time, weather, or jokes.",
-                f"'{command}' - got it! I'm better with questions about time, dates, weather, or if you want to hear a joke."
-            ]
-            return random.choice(responses), "calm"
+            return CATALOG.reply("real_voice.unknown", command=command), "calm"
     
     def run(self):
         print("\n🎯 NEXA with NATURAL Voice Recognition Activated!")
         print("💬 Speak naturally - I'll understand your actual voice!")
         print("✨ Try various ways to ask questions - I understand multiple phrasings!")
         
+        # Calibration must not hear the greeting itself
+        self.wait_until_ready()
+        
         # Start with time-based greeting
         initial_greeting = self.get_time_based_greeting()
         self.speak(f"{initial_greeting} I'm NEX-uh with genuine voice recognition! We can have real conversations now.", "excited")
         
         while True:
             print(f"\n" + "─" * 50)
+            turn = self.take_turn()
+            
+            if turn["done"]:
+                print("\n🛑 Conversation ended. Run the program again to start a new chat!")
+                self.report_wake_word()
+                break
+            if not turn["command"]:
+                continue
             
+            # Small pause for natural conversation flow
+            time.sleep(0.5)
+    
+    def take_turn(self):
+        """One listen -> reply -> speak round of the conversation
+
+        Returns what happened as a dict (command, intent, response, tone,
+        done, audio, trace); done is True once the user has said goodbye.
+        """
+        self.last_audio = None
+        self.last_intent = None
+        
+        # Every span recorded in here belongs to this turn's trace
+        with METRICS.turn() as trace:
             # Natural voice listening
             command = self.listen()
             
             if not command:
-                self.speak("I'm still here, go ahead when you're ready.", "calm")
-                continue
-                
-            response, tone = self.process_command(command)
-            
-            if any(word in command.lower() for word in ['bye', 'goodbye', 'stop', 'exit', 'quit', 'good night']):
-                self.speak(response, tone)
-                print("\n🛑 Conversation ended. Run the program again to start a new chat!")
-                break
+                response, tone, done = "I'm still here, go ahead when you're ready.", "calm", False
+            else:
+                response, tone = self.process_command(command)
+                done = bool(REAL_VOICE_EXIT_MATCHER.match(command.lower()))
             
             self.speak(response, tone)
-            
-            # Small pause for natural conversation flow
-            time.sleep(0.5)
+        
+        turn = {"command": command, "intent": self.last_intent, "response": response, "tone": tone,
+                "done": done, "audio": self.last_audio, "trace": trace}
+        if self.recorder:
+            self.recorder.record(turn)
+        return turn
+    
+    def respond(self, command):
+        """Pipeline intent stage: reply, tone and whether the chat is over"""
+        response, tone = self.process_command(command)
+        return response, tone, bool(REAL_VOICE_EXIT_MATCHER.match(command.lower()))
+    
+    def run_pipelined(self):
+        """Overlapped conversation loop: keeps listening while replies are spoken"""
+        print("\n🎯 NEXA Pipelined Voice Mode Activated!")
+        
+        # Imported here so the plain conversation loop starts without asyncio
+        import asyncio
+        from nexa_pipeline import ConversationPipeline
+        
+        self.wait_until_ready()
+        initial_greeting = self.get_time_based_greeting()
+        self.speak(f"{initial_greeting} I'm NEX-uh with genuine voice recognition! We can have real conversations now.", "excited")
+        
+        worker = get_speech_worker()
+        pipeline = ConversationPipeline(
+            capture=self.capture,
+            recognize=self.recognize,
+            respond=self.respond,
+            synthesize=self.synthesize,
+            play=worker.play,
+            stop_playback=worker.stop,
+        )
+        if pipeline.allow_barge_in:
+            print("💬 Talk over me any time - I'll stop and listen!")
+        else:
+            print("💬 I'll listen once I've finished talking (NEXA_BARGE_IN=1 with headphones lets you interrupt)")
+        try:
+            asyncio.run(pipeline.run())
+        except Exception as e:
+            print(f"❌ Conversation pipeline stopped: {e}")
+        
+        stats = pipeline.stats()
+        if stats["turns"]:
+            print(f"⏱️ {stats['turns']} turns, median turn latency {stats['median_latency']:.2f}s, {stats['barge_ins']} barge-ins")
+        print("\n🛑 Conversation ended. Run the program again to start a new chat!")
+        self.report_wake_word()
 
 if __name__ == "__main__":
     print("🎉 Starting NEXA with NATURAL Voice Conversations (Python 3.11)...")
-    nexa = NEXA_Real_Voice()
-    nexa.run()
\ No newline at end of file
+    start_metrics_export()
+    recorder = None
+    if os.environ.get("NEXA_RECORD"):
+        # Only recorded sessions pay for loading the archive writer
+        from nexa_replay import SessionRecorder
+        recorder = SessionRecorder(os.environ["NEXA_RECORD"])
+    nexa = NEXA_Real_Voice(recorder=recorder)
+    if "--pipeline" in sys.argv:
+        nexa.run_pipelined()
+    else:
+        nexa.run()
\ No newline at end of file
@@ -0,0 +1,280 @@
+import threading
+import hashlib
+import json
+import os
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from nexa_capture import Utterance
+from nexa_metrics import METRICS
+
+
+class RecognitionBusy(Exception):
+    """Every recognition slot is taken and the caller would not (or could no longer) wait"""
+
+
+class GoogleBackend:
+    """speech_recognition's Google Web Speech API (needs network)
+
+    Requests give up after operation_timeout seconds, so a hung connection
+    hands its recognition slot back instead of keeping it for good.
+    """
+
+    def __init__(self, operation_timeout=10):
+        self.operation_timeout = operation_timeout
+        self.sr = None
+        self.recognizer = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Import speech_recognition on first use; it is slow to load"""
+        with self.lock:
+            if self.recognizer is None:
+                import speech_recognition as sr
+                self.sr = sr
+                self.recognizer = sr.Recognizer()
+                self.recognizer.operation_timeout = self.operation_timeout
+
+    @METRICS.timed("recognize_google")
+    def recognize(self, audio):
+        self.load()
+        if not isinstance(audio, self.sr.AudioData):
+            audio = self.sr.AudioData(audio.frame_data, audio.sample_rate, audio.sample_width)
+        try:
+            return self.recognizer.recognize_google(audio)
+        except self.sr.UnknownValueError:
+            METRICS.count("recognition_unknown_value")
+            return None
+
+
+class LocalTranscriptBackend:
+    """Offline stand-in recognizer driven by a transcript file, no network needed
+
+    A .json file maps the SHA-1 of an utterance's raw audio to its text, so
+    recorded fixtures always decode the same way. Any other file is read as
+    one transcript per line, handed out in order; blank lines mean "couldn't
+    understand" and the last line repeats once the file runs out. Line
+    transcripts stream partials unless streaming is off, in which case
+    every clip is decoded whole like the live recognizer's.
+    """
+
+    def __init__(self, path, streaming=True):
+        self.path = path
+        self.streaming = streaming
+        self.by_audio = {}
+        self.lines = []
+        self.position = 0
+        self.lock = threading.Lock()
+        with open(path, "r", encoding="utf-8") as f:
+            if path.endswith(".json"):
+                self.by_audio = json.load(f)
+            else:
+                self.lines = [line.strip() for line in f]
+
+    @staticmethod
+    def fingerprint(audio):
+        return hashlib.sha1(audio.frame_data).hexdigest()
+
+    def next_line(self):
+        with self.lock:
+            if not self.lines:
+                return None
+            line = self.lines[min(self.position, len(self.lines) - 1)]
+            self.position += 1
+        return line or None
+
+    def recognize(self, audio):
+        if self.by_audio:
+            return self.by_audio.get(self.fingerprint(audio)) or None
+        return self.next_line()
+
+    def open_stream(self, sample_rate, sample_width):
+        # Fingerprints need the whole clip, so only line transcripts can stream
+        if self.by_audio or not self.streaming:
+            return None
+        return ScriptedStream(self.next_line, sample_rate, sample_width)
+
+
+class ScriptedStream:
+    """Partial transcripts for a known line, revealed word by word as audio arrives"""
+
+    def __init__(self, take_line, sample_rate, sample_width, words_per_second=3.0):
+        self.take_line = take_line
+        self.bytes_per_second = sample_rate * sample_width
+        self.words_per_second = words_per_second
+        self.seconds = 0.0
+        self.words = None
+
+    def feed(self, frame):
+        if self.words is None:
+            self.words = (self.take_line() or "").split()
+        self.seconds += len(frame) / self.bytes_per_second
+        heard = self.words[:int(self.seconds * self.words_per_second)]
+        return " ".join(heard) or None
+
+    def finish(self):
+        if self.words is None:
+            self.words = (self.take_line() or "").split()
+        return " ".join(self.words) or None
+
+
+class RedecodeStream:
+    """Partials for recognizers that cannot stream: re-decode the growing clip
+
+    Every interval seconds of new audio the clip so far is submitted to the
+    pool without blocking; whatever came back last is the current partial.
+    finish() returns None so the caller decodes the complete clip as usual.
+    """
+
+    def __init__(self, pool, sample_rate, sample_width, interval=1.0):
+        self.pool = pool
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.interval = interval
+        self.frames = []
+        self.seconds = 0.0
+        self.next_at = interval
+        self.pending = None
+        self.partial = None
+
+    def feed(self, frame):
+        self.frames.append(frame)
+        self.seconds += len(frame) / (self.sample_rate * self.sample_width)
+        if self.pending is not None and self.pending.done():
+            if not self.pending.cancelled() and self.pending.exception() is None:
+                self.partial = self.pending.result() or self.partial
+            self.pending = None
+        if self.pending is None and self.seconds >= self.next_at:
+            clip = Utterance(b''.join(self.frames), self.sample_rate, self.sample_width, 0, len(self.frames))
+            try:
+                self.pending = self.pool.submit(clip, block=False)
+            except RecognitionBusy:
+                pass
+            self.next_at = self.seconds + self.interval
+        return self.partial
+
+    def finish(self):
+        return None
+
+
+def get_recognizer_backend(spec=None):
+    """Recognizer from a spec: "google" (default) or "local:<transcript file>"
+
+    NEXA_RECOGNIZER supplies the spec when none is given.
+    """
+    spec = spec or os.environ.get("NEXA_RECOGNIZER", "google")
+    if spec.startswith("local:"):
+        return LocalTranscriptBackend(spec[6:])
+    return GoogleBackend()
+
+
+# Each process-pool worker builds its own backend from the spec once
+_process_backend = None
+
+
+def _init_process_backend(spec):
+    global _process_backend
+    _process_backend = get_recognizer_backend(spec)
+
+
+def _recognize_in_process(audio):
+    return _process_backend.recognize(audio)
+
+
+class RecognitionPool:
+    """Recognition jobs run off the main thread with a bounded queue and timeouts
+
+    At most max_pending jobs are queued or running at once; submit() blocks
+    (backpressure) or raises RecognitionBusy when full. With processes=True
+    the backend is built in every worker process from a spec string, which
+    keeps CPU-heavy local recognizers off the GIL; a backend object cannot
+    be sent there, so passing one is an error.
+    """
+
+    def __init__(self, backend=None, workers=2, max_pending=4, timeout=10, processes=False, partials=None):
+        self.timeout = timeout
+        # "redecode" gives partial transcripts even without a streaming backend
+        self.partials = partials or os.environ.get("NEXA_PARTIALS")
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        if processes:
+            if backend is not None and not isinstance(backend, str):
+                raise ValueError("processes=True builds the backend in each worker; pass a spec string, not an object")
+            self.backend = None
+            self.executor = ProcessPoolExecutor(
+                workers, initializer=_init_process_backend, initargs=(backend,)
+            )
+        else:
+            self.backend = get_recognizer_backend(backend) if backend is None or isinstance(backend, str) else backend
+            self.executor = ThreadPoolExecutor(workers, thread_name_prefix="nexa-recognizer")
+
+    def _finished(self, future):
+        self.slots.release()
+        with self.lock:
+            if future.cancelled() or future.exception():
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def submit(self, audio, block=True, timeout=None):
+        """Queue one utterance; returns a Future for its text
+
+        Waits at most timeout seconds (the pool's timeout by default) for a
+        free slot: jobs stuck in a backend keep theirs until they return.
+        """
+        if block:
+            acquired = self.slots.acquire(timeout=self.timeout if timeout is None else timeout)
+        else:
+            acquired = self.slots.acquire(blocking=False)
+        if not acquired:
+            with self.lock:
+                self.rejected += 1
+            raise RecognitionBusy("recognizer queue is full")
+        try:
+            if self.backend is None:
+                future = self.executor.submit(_recognize_in_process, audio)
+            else:
+                future = self.executor.submit(self.backend.recognize, audio)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(self._finished)
+        return future
+
+    def result(self, future, timeout=None):
+        """Text for a submitted job; raises concurrent.futures.TimeoutError if it takes too long"""
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except concurrent.futures.TimeoutError:
+            with self.lock:
+                self.timeouts += 1
+            future.cancel()
+            raise
+
+    def recognize(self, audio, timeout=None):
+        return self.result(self.submit(audio, timeout=timeout), timeout)
+
+    def stream(self, sample_rate, sample_width):
+        """Streaming session for partial transcripts, or None if unsupported"""
+        if self.backend is not None and hasattr(self.backend, "open_stream"):
+            session = self.backend.open_stream(sample_rate, sample_width)
+            if session is not None:
+                return session
+        if self.partials == "redecode":
+            return RedecodeStream(self, sample_rate, sample_width)
+        return None
+
+    def stats(self):
+        with self.lock:
+            return {
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected,
+            }
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -0,0 +1,139 @@
+import bisect
+import re
+from datetime import datetime, timedelta
+
+
+STOP_WORDS = {
+    "a", "an", "the", "to", "of", "for", "and", "or", "my", "me", "i",
+    "at", "on", "in", "about", "with", "set", "remind", "reminder", "remember",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text):
+    """Lowercase content words of a reminder or a query"""
+    return {word for word in TOKEN_PATTERN.findall(text.lower()) if word not in STOP_WORDS}
+
+
+def reminder_timestamp(reminder):
+    """When a reminder is due, as a time.time() timestamp
+
+    Newer reminders store "due" directly. Older ones only have a display time
+    like "05:00 PM" and a creation date, which are combined instead.
+    """
+    if reminder.get("due"):
+        return reminder["due"]
+    try:
+        created = datetime.fromisoformat(reminder["created"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    try:
+        shown = datetime.strptime(reminder.get("time", ""), "%I:%M %p")
+    except ValueError:
+        return created.timestamp()
+    return created.replace(hour=shown.hour, minute=shown.minute, second=0, microsecond=0).timestamp()
+
+
+def spoken_when(reminder, now=None):
+    """Day and time of a reminder for reading out, such as "tomorrow at 05:00 PM"
+
+    Reminders without a usable date fall back to their display time.
+    """
+    timestamp = reminder_timestamp(reminder)
+    if timestamp is None:
+        return f"at {reminder.get('time', 'some point')}"
+    due = datetime.fromtimestamp(timestamp)
+    today = (now or datetime.now()).date()
+    if due.date() == today:
+        day = "today"
+    elif due.date() == today + timedelta(days=1):
+        day = "tomorrow"
+    else:
+        day = "on " + due.strftime("%A, %B %d")
+    return f"{day} at {due.strftime('%I:%M %p')}"
+
+
+class ReminderIndex:
+    """Reminders indexed by due time and by the words in their text
+
+    The time index is a sorted list of (timestamp, id) pairs, so a range such
+    as "tomorrow" is two bisections plus the matches. The word index maps
+    each token to the ids whose text contains it, and a keyword query
+    intersects those sets starting from the rarest word. Reminders that
+    already fired (marked done) are left out, so only upcoming ones are
+    listed or found.
+    """
+
+    def __init__(self, reminders=None):
+        self.times = []  # (timestamp, id), sorted
+        self.words = {}  # token -> set of ids
+        self.indexed = {}  # id -> (timestamp, tokens)
+        if reminders:
+            self.build(reminders)
+
+    def build(self, reminders):
+        """Index every record of an id -> reminder table in one pass"""
+        for record_id, reminder in reminders.items():
+            if reminder.get("done"):
+                continue
+            timestamp = reminder_timestamp(reminder)
+            tokens = tokenize(reminder.get("text", ""))
+            self.indexed[record_id] = (timestamp, tokens)
+            if timestamp is not None:
+                self.times.append((timestamp, record_id))
+            for token in tokens:
+                self.words.setdefault(token, set()).add(record_id)
+        self.times.sort()
+
+    def add(self, record_id, reminder):
+        self.remove(record_id)
+        if reminder.get("done"):
+            return
+        timestamp = reminder_timestamp(reminder)
+        tokens = tokenize(reminder.get("text", ""))
+        self.indexed[record_id] = (timestamp, tokens)
+        if timestamp is not None:
+            bisect.insort(self.times, (timestamp, record_id))
+        for token in tokens:
+            self.words.setdefault(token, set()).add(record_id)
+
+    def remove(self, record_id):
+        entry = self.indexed.pop(record_id, None)
+        if entry is None:
+            return
+        timestamp, tokens = entry
+        if timestamp is not None:
+            position = bisect.bisect_left(self.times, (timestamp, record_id))
+            if position < len(self.times) and self.times[position] == (timestamp, record_id):
+                del self.times[position]
+        for token in tokens:
+            ids = self.words.get(token)
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del self.words[token]
+
+    def between(self, start, end):
+        """Ids due in [start, end), earliest first; bounds are timestamps"""
+        first = bisect.bisect_left(self.times, (start,))
+        last = bisect.bisect_left(self.times, (end,))
+        return [record_id for _, record_id in self.times[first:last]]
+
+    def search(self, query):
+        """Ids whose text contains every content word of query, earliest first"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        matches = None
+        for token in sorted(tokens, key=lambda token: len(self.words.get(token, ()))):
+            ids = self.words.get(token)
+            if not ids:
+                return []
+            matches = set(ids) if matches is None else matches & ids
+            if not matches:
+                return []
+        return sorted(matches, key=lambda record_id: (self.indexed[record_id][0] or 0, record_id))
+
+    def __len__(self):
+        return len(self.indexed)
\ No newline at end of file
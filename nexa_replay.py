@@ -0,0 +1,263 @@
+import argparse
+import atexit
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+ARCHIVE_VERSION = 1
+
+
+def turn_timings(trace):
+    """Seconds per span name in one turn trace, plus the whole turn"""
+    timings = {}
+    for name, _, seconds in trace.spans:
+        timings[name] = timings.get(name, 0.0) + seconds
+    timings["turn"] = trace.duration
+    return timings
+
+
+class SessionRecorder:
+    """Keeps every turn of a NEXA_Real_Voice conversation in a zip archive
+
+    Each turn's captured audio goes in as raw PCM (deflated) as soon as the
+    turn is over. session.json, written on close, holds the transcript,
+    intent, reply, tone and stage timings of every turn and the settings
+    the session started with: everything a replay needs. Set NEXA_RECORD
+    to an archive path to record a session.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.archive = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        self.manifest = {"version": ARCHIVE_VERSION, "started_at": time.time(), "settings": {}, "turns": []}
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+        print(f"📼 Recording this session to {path}")
+
+    def begin(self, **settings):
+        """Settings the replay has to start from (name, voice, noise threshold)"""
+        self.manifest["settings"].update(settings)
+
+    def record(self, turn):
+        """Store one turn as returned by NEXA_Real_Voice.take_turn()"""
+        with self.lock:
+            if self.archive is None:
+                return
+            trace = turn["trace"]
+            entry = {
+                "at": trace.started_at - self.manifest["started_at"],
+                "transcript": turn["command"],
+                "intent": turn["intent"],
+                "reply": turn["response"],
+                "tone": turn["tone"],
+                "done": turn["done"],
+                "timings": turn_timings(trace),
+                "audio": None,
+            }
+            audio = turn["audio"]
+            if audio is not None:
+                entry["audio"] = f"audio/{len(self.manifest['turns']) + 1:05d}.pcm"
+                entry["sample_rate"] = audio.sample_rate
+                entry["sample_width"] = audio.sample_width
+                self.archive.writestr(entry["audio"], audio.frame_data)
+            self.manifest["turns"].append(entry)
+
+    def close(self):
+        with self.lock:
+            if self.archive is None:
+                return
+            self.archive.writestr("session.json", json.dumps(self.manifest, separators=(",", ":")))
+            self.archive.close()
+            self.archive = None
+        print(f"📼 Saved {len(self.manifest['turns'])} turns to {self.path}")
+
+
+class SessionArchive:
+    """A recorded session read back: settings, turns and their audio"""
+
+    def __init__(self, path):
+        self.path = path
+        with zipfile.ZipFile(path) as archive:
+            self.manifest = json.loads(archive.read("session.json"))
+            if self.manifest.get("version") != ARCHIVE_VERSION:
+                raise ValueError(f"{path}: unsupported session archive version {self.manifest.get('version')}")
+            self.audio = {turn["audio"]: archive.read(turn["audio"]) for turn in self.turns if turn["audio"]}
+
+    @property
+    def settings(self):
+        return self.manifest["settings"]
+
+    @property
+    def turns(self):
+        return self.manifest["turns"]
+
+    def spoken_turns(self):
+        """Turns that captured audio; timeouts had nothing to replay"""
+        return [turn for turn in self.turns if turn["audio"]]
+
+    def duration(self):
+        """Seconds from the start of the recording to the end of the last turn"""
+        if not self.turns:
+            return 0.0
+        last = self.turns[-1]
+        return last["at"] + (last["timings"].get("turn") or 0.0)
+
+
+class ArchiveSource:
+    """Audio source that plays a session's recorded phrases back to back
+
+    Phrases are separated by gap seconds of silence, longer than any pause
+    capture allows inside a phrase, so each comes out as one utterance
+    again. It is not live, so capture reads it as fast as it can.
+    """
+
+    def __init__(self, archive, gap=1.0, lead=1.5, chunk=1024):
+        self.archive = archive
+        self.gap = gap
+        self.lead = lead
+        self.chunk = chunk
+        self.live = False
+        turns = archive.spoken_turns()
+        self.sample_rate = turns[0]["sample_rate"] if turns else 16000
+        self.sample_width = turns[0]["sample_width"] if turns else 2
+
+    def open(self):
+        silence = bytes(int(self.gap * self.sample_rate) * self.sample_width)
+        parts = [bytes(int(self.lead * self.sample_rate) * self.sample_width)]
+        for turn in self.archive.spoken_turns():
+            parts += [self.archive.audio[turn["audio"]], silence]
+        self.data = b"".join(parts)
+        self.position = 0
+
+    def read(self):
+        size = self.chunk * self.sample_width
+        frame = self.data[self.position:self.position + size]
+        if not frame:
+            return None
+        self.position += size
+        return frame
+
+    def close(self):
+        pass
+
+
+class ArchiveRecognizer:
+    """Stand-in recognizer that hears what was recognized during the recording"""
+
+    def __init__(self, transcripts):
+        self.transcripts = list(transcripts)
+        self.position = 0
+        self.lock = threading.Lock()
+
+    def recognize(self, audio):
+        with self.lock:
+            if self.position >= len(self.transcripts):
+                return None
+            transcript = self.transcripts[self.position]
+            self.position += 1
+        return transcript
+
+
+def replay(path, work_dir, gap=1.0):
+    """Drive NEXA_Real_Voice through a recorded session; (archive, [(recorded, replayed)], seconds)"""
+    from nexa_benchmark import quiet_assistant
+    archive = SessionArchive(path)
+    recorded = archive.spoken_turns()
+    # The replay starts with the name, voice and noise threshold the recording started with
+    state_path = os.path.join(work_dir, "state.json")
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump({key: value for key, value in archive.settings.items() if value is not None}, f)
+
+    start = time.perf_counter()
+    pairs = []
+    with quiet_assistant(
+        audio_source=ArchiveSource(archive, gap),
+        recognizer_backend=ArchiveRecognizer(turn["transcript"] for turn in recorded),
+        state_path=state_path,
+        wake_word=False,
+    ) as nexa:
+        for turn in recorded:
+            replayed = nexa.take_turn()
+            pairs.append((turn, replayed))
+            if replayed["done"]:
+                break
+    return archive, pairs, time.perf_counter() - start
+
+
+def compare_turns(pairs):
+    """Turns whose intent or ending changed since the recording, as text lines"""
+    changes = []
+    for number, (recorded, replayed) in enumerate(pairs, 1):
+        if replayed["command"] != recorded["transcript"]:
+            changes.append(f"turn {number}: heard '{replayed['command']}', recorded '{recorded['transcript']}'")
+        elif replayed["intent"] != recorded["intent"] or replayed["done"] != recorded["done"]:
+            changes.append(f"turn {number} '{recorded['transcript']}': intent {recorded['intent']} -> {replayed['intent']}"
+                           + (" (now ends the chat)" if replayed["done"] and not recorded["done"] else ""))
+    return changes
+
+
+def build_report(archive, pairs, seconds):
+    from nexa_benchmark import summarize
+    report = {
+        "archive": archive.path,
+        "recorded_turns": len(archive.turns),
+        "replayed_turns": len(pairs),
+        "session_seconds": archive.duration(),
+        "replay_seconds": seconds,
+        "stages": {},
+        "changes": compare_turns(pairs),
+    }
+    for stage in ("capture", "recognize", "process_command", "speak", "turn"):
+        report["stages"][stage] = {
+            "recorded": summarize([turn["timings"][stage] for turn, _ in pairs if stage in turn["timings"]]),
+            "replayed": summarize([timings[stage] for timings in
+                                   (turn_timings(replayed["trace"]) for _, replayed in pairs) if stage in timings]),
+        }
+    return report
+
+
+def print_report(report):
+    speedup = report["session_seconds"] / report["replay_seconds"] if report["replay_seconds"] else 0.0
+    print(f"📼 Replayed {report['replayed_turns']} of {report['recorded_turns']} turns: "
+          f"{report['session_seconds']:.0f} s of conversation in {report['replay_seconds']:.2f} s ({speedup:.0f}x)")
+    print(f"   {'stage':<16}{'recorded p50':>14}{'replayed p50':>14}{'replayed p95':>14}  (ms)")
+    for stage, stats in report["stages"].items():
+        print(f"   {stage:<16}{stats['recorded']['p50'] * 1000:>14.2f}"
+              f"{stats['replayed']['p50'] * 1000:>14.2f}{stats['replayed']['p95'] * 1000:>14.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded NEXA session with stubbed recognition and speech")
+    parser.add_argument("archive", help="session archive written with NEXA_RECORD")
+    parser.add_argument("--gap", type=float, default=1.0, help="seconds of silence between replayed phrases")
+    parser.add_argument("--json", help="also write the full report here")
+    parser.add_argument("--verbose", action="store_true", help="show NEXA's own output while replaying")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="nexa_replay_") as work_dir:
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with output:
+            archive, pairs, seconds = replay(args.archive, work_dir, args.gap)
+    report = build_report(archive, pairs, seconds)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if report["changes"]:
+        print("🚨 BEHAVIOUR CHANGED SINCE THE RECORDING")
+        for change in report["changes"]:
+            print(f"   ❌ {change}")
+        return 1
+    print("✅ Every turn was understood as it was when recorded")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+def next_time_of_day(hour, minute=0, now=None):
+    """Next wall-clock moment at hour:minute, today if still ahead, else tomorrow"""
+    now = now or datetime.now()
+    due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if due <= now:
+        due += timedelta(days=1)
+    return due
+
+
+class ReminderScheduler:
+    """Background thread that fires reminders and alarms on time
+
+    Pending items sit in a min-heap ordered by a monotonic deadline, so
+    insert is O(log n) and the thread sleeps until exactly the next item is
+    due (or an earlier one is added). Cancelling only marks the heap entry
+    dead; the heap is rebuilt once dead entries outnumber live ones. Items
+    whose time passed while the process was down fire as soon as the
+    scheduler starts, with how late they are passed along.
+    """
+
+    def __init__(self, deliver):
+        self.deliver = deliver  # deliver(key, seconds_late)
+        self.heap = []
+        self.entries = {}  # key -> [deadline, order, key, alive]
+        self.order = itertools.count()
+        self.dead = 0
+        self.fired = 0
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    @staticmethod
+    def deadline(due):
+        """Monotonic deadline for a wall-clock timestamp (time.time() seconds)"""
+        return time.monotonic() + (due - time.time())
+
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._run, name="nexa-scheduler", daemon=True)
+        self.thread.start()
+
+    def schedule(self, key, due):
+        entry = [self.deadline(due), next(self.order), key, True]
+        with self.condition:
+            self._cancel(key)
+            self.entries[key] = entry
+            heapq.heappush(self.heap, entry)
+            if self.heap[0] is entry:
+                self.condition.notify()
+
+    def schedule_many(self, items):
+        """Bulk load (key, due) pairs in O(n), e.g. everything pending at startup"""
+        with self.condition:
+            for key, due in items:
+                self._cancel(key)
+                entry = [self.deadline(due), next(self.order), key, True]
+                self.entries[key] = entry
+                self.heap.append(entry)
+            heapq.heapify(self.heap)
+            self.condition.notify()
+
+    def cancel(self, key):
+        with self.condition:
+            return self._cancel(key)
+
+    def _cancel(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        entry[3] = False
+        self.dead += 1
+        if self.dead > 64 and self.dead > len(self.entries):
+            self.heap = [item for item in self.heap if item[3]]
+            heapq.heapify(self.heap)
+            self.dead = 0
+        return True
+
+    def pending(self):
+        with self.condition:
+            return len(self.entries)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running:
+                    while self.heap and not self.heap[0][3]:
+                        heapq.heappop(self.heap)
+                        self.dead -= 1
+                    if not self.heap:
+                        self.condition.wait()
+                        continue
+                    delay = self.heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self.condition.wait(delay)
+                if not self.running:
+                    return
+                entry = heapq.heappop(self.heap)
+                del self.entries[entry[2]]
+                self.fired += 1
+            try:
+                self.deliver(entry[2], time.monotonic() - entry[0])
+            except Exception as e:
+                print(f"⏰ Reminder delivery failed: {e}")
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread:
+            self.thread.join(timeout=2)
\ No newline at end of file
@@ -0,0 +1,124 @@
+import os
+import re
+import zlib
+import numpy as np
+
+WORDS = re.compile(r"[a-z0-9']+")
+
+
+def semantic_enabled():
+    """The paraphrase fallback is on unless NEXA_SEMANTIC=0"""
+    return os.environ.get("NEXA_SEMANTIC", "1") != "0"
+
+
+def semantic_threshold():
+    return float(os.environ.get("NEXA_SEMANTIC_THRESHOLD", "0.55"))
+
+
+class NgramHasher:
+    """Text to unit-length vectors of hashed word and character n-grams
+
+    Features are the words, adjacent word pairs and the character
+    trigrams of each word (padded with spaces, so word starts and ends
+    count), hashed with CRC-32 into a fixed number of dimensions. Nothing
+    is learned or downloaded; two phrasings are close when they share
+    words or word pieces, which is what "got the time" and "do you have
+    the time" have in common.
+    """
+
+    def __init__(self, dims=2048, char_weight=0.5):
+        self.dims = dims
+        self.char_weight = char_weight
+
+    def features(self, text):
+        """(dimension, weight) pairs for one text"""
+        words = WORDS.findall(text.lower())
+        result = [(word, 1.0) for word in words]
+        result += [(f"{a} {b}", 1.0) for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f" {word} "
+            result += [("#" + padded[i:i + 3], self.char_weight) for i in range(len(padded) - 2)]
+        return [(zlib.crc32(name.encode("utf-8")) % self.dims, weight) for name, weight in result]
+
+    def counts(self, texts):
+        """(len(texts), dims) float32 matrix of feature weights, one row per text"""
+        rows, columns, weights = [], [], []
+        for row, text in enumerate(texts):
+            for column, weight in self.features(text):
+                rows.append(row)
+                columns.append(column)
+                weights.append(weight)
+        matrix = np.zeros((len(texts), self.dims), np.float32)
+        np.add.at(matrix, (np.asarray(rows, np.intp), np.asarray(columns, np.intp)), weights)
+        return matrix
+
+
+class SemanticClassifier:
+    """Nearest-example intent classifier over hashed n-gram vectors
+
+    Every example phrasing is one row of a precomputed matrix, so scoring
+    a batch of utterances is one matrix product: cosine similarity of each
+    utterance to each example. Dimensions are weighted by how rare they
+    are among the examples, so "what" and "is" count for little and "time"
+    for a lot. An utterance takes the intent of its most similar example
+    when that similarity reaches the threshold, beats the best example of
+    any other intent by the margin, and the utterance holds at least the
+    coverage share of that example's weighted features. The last check is
+    what keeps "tell me the news" off "tell me the time": similar, but the
+    word that mattered is gone. The price is that plain synonym swaps
+    ("coat" for "jacket") need an example of their own.
+    """
+
+    def __init__(self, examples, owners, names, threshold=0.55, margin=0.1, coverage=0.9, hasher=None):
+        self.hasher = hasher or NgramHasher()
+        self.names = names
+        self.threshold = threshold
+        self.margin = margin
+        self.coverage = coverage
+        self.owners = np.asarray(owners, dtype=np.int64)
+        counts = self.hasher.counts(examples)
+        present = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((1 + len(examples)) / (1 + present)) + 1).astype(np.float32)
+        self.weights = counts * self.idf
+        self.matrix = self.vectors(counts)
+
+    @classmethod
+    def from_table(cls, table, threshold=None):
+        """Classifier over the example phrasings compiled into an intent table"""
+        if threshold is None:
+            threshold = semantic_threshold()
+        return cls(table.examples(), table.example_owners, table.names, threshold)
+
+    def vectors(self, counts):
+        """IDF-weighted, unit-length rows"""
+        weighted = counts * self.idf
+        return weighted / np.maximum(np.linalg.norm(weighted, axis=1, keepdims=True), 1e-6)
+
+    def scores(self, texts):
+        """(len(texts), examples) cosine similarities"""
+        return self.vectors(self.hasher.counts(texts)) @ self.matrix.T
+
+    def predict(self, texts):
+        """(intent or None, confidence) for each text, all scored at once"""
+        if not len(self.owners) or not texts:
+            return [(None, 0.0) for _ in texts]
+        counts = self.hasher.counts(texts)
+        similarity = self.vectors(counts) @ self.matrix.T
+        rows = np.arange(len(texts))
+        best = similarity.argmax(axis=1)
+        confidence = similarity[rows, best]
+        # Best score among examples of any other intent
+        same = self.owners[None, :] == self.owners[best][:, None]
+        runner_up = np.where(same, -1.0, similarity).max(axis=1)
+        # Share of the best example's weighted features the text also has
+        example = self.weights[best]
+        covered = np.minimum(counts * self.idf, example).sum(axis=1) / np.maximum(example.sum(axis=1), 1e-6)
+        accepted = (confidence >= self.threshold) & (confidence - runner_up >= self.margin) & (covered >= self.coverage)
+        return [
+            (self.names[self.owners[example]] if ok else None, float(score))
+            for example, score, ok in zip(best, confidence, accepted)
+        ]
+
+    def classify(self, text):
+        """Intent for one text, or None when nothing is similar enough"""
+        return self.predict([text])[0][0]
\ No newline at end of file
@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from nexa_batch import VARIANTS, make_assistant
+from nexa_intents import CATALOG
+from nexa_startup import WarmState
+from nexa_sessions import SessionState, SessionStore
+
+# Conversation state that belongs to a client rather than to the engine
+SESSION_FIELDS = ("user_name", "voice_index", "conversation_context")
+# Assistant methods that read or write the worker's reminders and alarms
+PERSONAL_DATA_METHODS = ("set_reminder", "set_alarm", "list_reminders", "find_reminders")
+PERSONAL_DATA_REPLY = "Reminders and alarms aren't available in server sessions."
+
+
+class SessionEngine:
+    """A single NEXA instance answering for any number of sessions
+
+    process_command reads and writes per-user attributes such as user_name
+    on the instance. Before each command the session's state is put on the
+    instance and afterwards read back, so sessions never see each other's
+    state. Assistants that keep that state in a SessionState (self.session)
+    just get the record swapped; others have the fields copied. Commands
+    run one at a time on the event loop; they take microseconds, so nothing
+    else waits noticeably. A session whose state changed is saved as soon as
+    its command is done, so the next request may go to any worker. A
+    connection's own session only ever lives in the worker that accepted
+    the connection, so it is never written to disk.
+
+    Reminders and alarms are switched off: the assistants keep them in one
+    journal per worker, shared by every session on it, and the scheduler
+    would speak them on the server rather than to the client.
+    """
+
+    def __init__(self, assistant, session_dir="nexa_sessions"):
+        self.assistant = assistant
+        self.swaps_record = isinstance(getattr(assistant, "session", None), SessionState)
+        self.fields = [name for name in SESSION_FIELDS if hasattr(assistant, name)]
+        defaults = {name: getattr(assistant, name) for name in self.fields}
+        defaults.pop("conversation_context", None)
+        self.store = SessionStore(session_dir, defaults=defaults)
+        if hasattr(assistant, "state"):
+            # Names told to one session must not become the saved default for everyone
+            assistant.state = WarmState(None)
+        if hasattr(assistant, "scheduler"):
+            assistant.scheduler.stop()
+            for name in PERSONAL_DATA_METHODS:
+                if hasattr(assistant, name):
+                    setattr(assistant, name, self.personal_data_unavailable)
+
+    @staticmethod
+    def personal_data_unavailable(*args, **kwargs):
+        return PERSONAL_DATA_REPLY
+
+    def end(self, session_id):
+        self.store.discard(session_id)
+
+    def voice(self, session_id):
+        """Voice the session's replies are rendered with, or None for the default"""
+        if not self.swaps_record and "voice_index" not in self.fields:
+            return None
+        return self.store.get(session_id).voice_index
+
+    def handle(self, session_id, command, persist=True):
+        """Run one command for one session; returns the reply record"""
+        session = self.store.get(session_id)
+        session.turns += 1
+        before = self.snapshot(session)
+        record = {"session": session_id, "turn": session.turns}
+        if self.swaps_record:
+            self.assistant.session = session
+        else:
+            for name in self.fields:
+                value = getattr(session, name)
+                setattr(self.assistant, name, {} if value is None and name == "conversation_context" else value)
+        start = time.perf_counter()
+        try:
+            result = self.assistant.process_command(command)
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        else:
+            if isinstance(result, tuple):
+                record["response"], record["tone"] = result[0], result[1]
+            else:
+                record["response"] = result
+        finally:
+            if not self.swaps_record:
+                for name in self.fields:
+                    setattr(session, name, getattr(self.assistant, name))
+                session.conversation_context = session.conversation_context or None
+            if persist and self.snapshot(session) != before:
+                session.dirty = True
+                self.store.save(session)
+        record["seconds"] = time.perf_counter() - start
+        return record
+
+    @staticmethod
+    def snapshot(session):
+        """The state a command could change; the turn counter alone is not worth a write"""
+        return json.dumps(session.to_record()[:-1], sort_keys=True, default=str)
+
+
+class NexaServer:
+    """Line-based JSON protocol over a stream socket
+
+    A client sends one request per line, either plain command text or
+    {"session": "...", "command": "...", "speak": false}. Plain lines belong
+    to a session for that connection; named sessions let one connection
+    multiplex many users. Every request gets one JSON line back. With speak
+    the reply is also rendered to audio in a thread pool and its file path
+    returned as "audio", so synthesis never holds up other clients.
+    """
+
+    def __init__(self, engine, tts_threads=2):
+        self.engine = engine
+        self.tts_pool = ThreadPoolExecutor(tts_threads, thread_name_prefix="nexa-server-tts")
+        self.connection_ids = itertools.count(1)
+        self.connections = 0
+        self.requests = 0
+
+    def parse(self, text, connection_session):
+        if not text.startswith("{"):
+            return connection_session, text, False
+        request = json.loads(text)
+        return str(request.get("session") or connection_session), str(request.get("command", "")), bool(request.get("speak"))
+
+    def render(self, text, voice=None):
+        from nexa_tts import get_speech_worker
+        return get_speech_worker().render(text, voice)
+
+    async def handle_client(self, reader, writer):
+        connection_session = f"connection-{os.getpid()}-{next(self.connection_ids)}"
+        self.connections += 1
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                text = line.decode("utf-8", errors="replace").strip()
+                if not text:
+                    continue
+                self.requests += 1
+                try:
+                    session_id, command, speak = self.parse(text, connection_session)
+                except ValueError:
+                    record = {"error": "request is not valid JSON"}
+                else:
+                    record = self.engine.handle(session_id, command, persist=session_id != connection_session)
+                    if speak and "response" in record:
+                        try:
+                            voice = self.engine.voice(session_id)
+                            record["audio"] = await loop.run_in_executor(self.tts_pool, self.render, record["response"], voice)
+                        except Exception as e:
+                            record["audio_error"] = str(e)
+                writer.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            self.engine.end(connection_session)
+            writer.close()
+
+    async def expire_sessions(self, every=60):
+        """Write idle sessions back to disk even when no requests come in"""
+        while True:
+            await asyncio.sleep(every)
+            self.engine.store.expire()
+
+    async def serve(self, sock):
+        server = await asyncio.start_server(self.handle_client, sock=sock, limit=64 * 1024)
+        expiry = asyncio.create_task(self.expire_sessions())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiry.cancel()
+            self.engine.store.flush()
+
+
+def open_listener(address, backlog=1024):
+    """Listening socket for "unix:<path>" or "<host>:<port>" (loopback by default)"""
+    if address.startswith("unix:"):
+        path = address[5:]
+        if os.path.exists(path):
+            os.unlink(path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(path)
+    else:
+        host, _, port = address.rpartition(":")
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host or "127.0.0.1", int(port)))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+
+def run_worker(sock, variant, data_dir, session_dir):
+    """Serve on an already listening socket until interrupted"""
+    # Each worker has its own data files; journals are single-writer
+    os.makedirs(data_dir, exist_ok=True)
+    os.chdir(data_dir)
+    # Session files are written atomically, so all workers share them
+    engine = SessionEngine(make_assistant(variant), session_dir)
+    try:
+        asyncio.run(NexaServer(engine).serve(sock))
+    except KeyboardInterrupt:
+        pass
+
+
+def prefork(sock, workers, variant, data_dir, session_dir):
+    """Fork workers that all accept on the same socket; the kernel spreads connections"""
+    children = []
+    for number in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+            run_worker(sock, variant, os.path.join(data_dir, f"worker-{number}"), session_dir)
+            os._exit(0)
+        children.append(pid)
+    print(f"🧵 {workers} workers serving: {', '.join(map(str, children))}")
+    try:
+        for _ in children:
+            os.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve NEXA text sessions over a local socket")
+    parser.add_argument("--listen", default="127.0.0.1:8765", help="host:port or unix:<path>")
+    parser.add_argument("--variant", default="real_voice", choices=sorted(VARIANTS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="pre-forked worker processes")
+    parser.add_argument("--data-dir", default="nexa_server_data", help="where workers keep their data files")
+    args = parser.parse_args()
+
+    address = args.listen
+    if address.startswith("unix:"):
+        # Workers change directory, so the socket path must not be relative
+        address = "unix:" + os.path.abspath(address[5:])
+    sock = open_listener(address)
+    # Mapped before forking, so every worker shares the one compiled pack
+    print(f"📦 Intent pack: {CATALOG.phrase_count} phrases")
+    data_dir = os.path.abspath(args.data_dir)
+    session_dir = os.path.join(data_dir, "sessions")
+    print(f"🌐 NEXA server on {address} ({args.variant})")
+    try:
+        if args.workers > 1 and hasattr(os, "fork"):
+            prefork(sock, args.workers, args.variant, data_dir, session_dir)
+        else:
+            run_worker(sock, args.variant, os.path.join(data_dir, "worker-0"), session_dir)
+    finally:
+        sock.close()
+        if address.startswith("unix:") and os.path.exists(address[5:]):
+            os.unlink(address[5:])
+    print("🛑 NEXA server stopped")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
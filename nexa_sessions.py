@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionState:
+    """Everything one user's conversation needs, in a few hundred bytes"""
+
+    __slots__ = ("id", "user_name", "voice_index", "conversation_context", "turns", "last_seen", "dirty", "stamp")
+
+    def __init__(self, session_id, user_name=None, voice_index=1, conversation_context=None, turns=0):
+        self.id = session_id
+        self.user_name = user_name
+        self.voice_index = voice_index
+        # None until something is remembered; most sessions never need the dict
+        self.conversation_context = conversation_context or None
+        self.turns = turns
+        self.last_seen = time.monotonic()
+        self.dirty = False
+        # mtime_ns of the session file this copy was read from or written to
+        self.stamp = None
+
+    def to_record(self):
+        return [self.user_name, self.voice_index, self.conversation_context, self.turns]
+
+    @classmethod
+    def from_record(cls, session_id, record):
+        return cls(session_id, *record)
+
+
+def session_field(name):
+    """Instance attribute that lives on self.session instead of the instance"""
+
+    def get(self):
+        value = getattr(self.session, name)
+        if value is None and name == "conversation_context":
+            value = self.session.conversation_context = {}
+        return value
+
+    def set(self, value):
+        setattr(self.session, name, value)
+
+    return property(get, set)
+
+
+class SessionStore:
+    """Sessions in memory with LRU order and idle expiry, backed by one file per session
+
+    Every access moves a session to the back of the LRU, so the longest-idle
+    ones are always at the front: expiry and the capacity limit only ever
+    look there. Changed sessions are written to <directory>/<xx>/<sha1>.json
+    by save() (atomically, so several worker processes can share the
+    directory). A session kept in memory is checked against its file on
+    every get() and read again if another process has saved it since.
+    """
+
+    def __init__(self, directory="nexa_sessions", capacity=10000, ttl=1800, defaults=None):
+        self.directory = directory
+        self.capacity = capacity
+        self.ttl = ttl
+        self.defaults = defaults or {}
+        self.sessions = OrderedDict()  # id -> SessionState, least recently used first
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.rehydrated = 0
+        self.created = 0
+        self.evicted = 0
+        self.written = 0
+
+    def path(self, session_id):
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + ".json")
+
+    def get(self, session_id):
+        """The session for this id: in memory, read back from disk, or new"""
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is not None and self._stale(session):
+                session = None
+            if session is not None:
+                self.sessions.move_to_end(session_id)
+                self.hits += 1
+            else:
+                session = self._load(session_id)
+                self.sessions[session_id] = session
+            session.last_seen = time.monotonic()
+            self._expire()
+            return session
+
+    def _stale(self, session):
+        """Whether another process saved this session after our copy was read"""
+        try:
+            stamp = os.stat(self.path(session.id)).st_mtime_ns
+        except OSError:
+            return False
+        return stamp != session.stamp
+
+    def _load(self, session_id):
+        try:
+            with open(self.path(session_id), "r", encoding="utf-8") as f:
+                session = SessionState.from_record(session_id, json.load(f))
+                session.stamp = os.fstat(f.fileno()).st_mtime_ns
+            self.rehydrated += 1
+        except (OSError, ValueError, TypeError):
+            session = SessionState(session_id, **self.defaults)
+            self.created += 1
+        return session
+
+    def _write(self, session):
+        path = self.path(session.id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(session.to_record(), f, separators=(",", ":"))
+            f.flush()
+            # The renamed file keeps this mtime, so later saves by others are noticed
+            session.stamp = os.fstat(f.fileno()).st_mtime_ns
+        os.replace(temp_path, path)
+        session.dirty = False
+        self.written += 1
+
+    def _evict_oldest(self):
+        _, session = self.sessions.popitem(last=False)
+        if session.dirty:
+            self._write(session)
+        self.evicted += 1
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        while self.sessions:
+            oldest = next(iter(self.sessions.values()))
+            if len(self.sessions) <= self.capacity and oldest.last_seen > cutoff:
+                break
+            self._evict_oldest()
+
+    def save(self, session):
+        """Write a session through to disk now if it changed"""
+        with self.lock:
+            if session.dirty:
+                self._write(session)
+
+    def expire(self):
+        """Write back and drop sessions idle for longer than ttl; returns how many are left"""
+        with self.lock:
+            self._expire()
+            return len(self.sessions)
+
+    def discard(self, session_id):
+        """Forget a session without saving it (e.g. an anonymous connection ended)"""
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def flush(self):
+        """Write every changed session to disk, keeping them in memory"""
+        with self.lock:
+            for session in self.sessions.values():
+                if session.dirty:
+                    self._write(session)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "in_memory": len(self.sessions),
+                "hits": self.hits,
+                "rehydrated": self.rehydrated,
+                "created": self.created,
+                "evicted": self.evicted,
+                "written": self.written,
+            }
\ No newline at end of file
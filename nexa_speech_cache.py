@@ -0,0 +1,142 @@
+import hashlib
+import tempfile
+import threading
+import os
+from collections import OrderedDict
+
+
+class SpeechCache:
+    """Rendered speech on disk, addressed by (text, voice, rate), with LRU eviction"""
+
+    def __init__(self, cache_dir=None, max_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "nexa_speech_cache")
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # file name -> size, least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Pick up audio rendered by earlier sessions, oldest use first"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith("part-"):
+                # Left behind by a render that never finished
+                os.unlink(path)
+            elif name.endswith(".wav"):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self.entries[name] = size
+            self.total_bytes += size
+        self.evict()
+
+    @staticmethod
+    def normalize(text):
+        return " ".join(text.split())
+
+    @staticmethod
+    def voice_tag(voice):
+        return "default" if voice is None else str(voice)
+
+    def file_name(self, text, voice, rate):
+        key = f"{voice}|{rate}|{self.normalize(text)}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return f"{self.voice_tag(voice)}_{digest}.wav"
+
+    def lookup(self, text, voice, rate):
+        """Path of the cached audio, or None on a miss"""
+        name = self.file_name(text, voice, rate)
+        path = os.path.join(self.cache_dir, name)
+        with self.lock:
+            if name in self.entries and os.path.exists(path):
+                self.entries.move_to_end(name)
+                self.hits += 1
+                # Keep the on-disk order in step for the next session's load()
+                os.utime(path)
+                return path
+            self.entries.pop(name, None)
+            self.misses += 1
+        return None
+
+    def add(self, name):
+        path = os.path.join(self.cache_dir, name)
+        with self.lock:
+            size = os.path.getsize(path)
+            self.total_bytes += size - self.entries.pop(name, 0)
+            self.entries[name] = size
+            self.evict()
+
+    def evict(self):
+        # The newest entry always stays, even if it alone is over budget
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            name, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.unlink(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def fetch(self, backend, text, voice, rate):
+        """Return a playable file for the text, rendering it with the backend on a miss"""
+        path = self.lookup(text, voice, rate)
+        if path:
+            return path
+        name = self.file_name(text, voice, rate)
+        path = os.path.join(self.cache_dir, name)
+        # SAPI picks the file format from the extension, so keep .wav
+        partial = os.path.join(self.cache_dir, "part-" + name)
+        backend.render(text, voice, rate, partial)
+        os.replace(partial, path)
+        self.add(name)
+        return path
+
+    def invalidate(self, voice=None):
+        """Drop cached audio for one voice, or everything when voice is None"""
+        prefix = None if voice is None else self.voice_tag(voice) + "_"
+        with self.lock:
+            for name in list(self.entries):
+                if prefix is None or name.startswith(prefix):
+                    self.total_bytes -= self.entries.pop(name)
+                    try:
+                        os.unlink(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_caches = {}
+_cache_lock = threading.Lock()
+
+
+def get_speech_cache(backend_name):
+    """Shared speech cache for one TTS backend, or None when NEXA_SPEECH_CACHE=0
+
+    Each backend gets its own directory: the same text, voice and rate
+    sound different from SAPI and from the WAV renderer.
+    """
+    if os.environ.get("NEXA_SPEECH_CACHE", "1").lower() in ("0", "off", "no"):
+        return None
+    with _cache_lock:
+        if backend_name not in _caches:
+            base = os.environ.get("NEXA_SPEECH_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "nexa_speech_cache")
+            max_mb = int(os.environ.get("NEXA_SPEECH_CACHE_MB", "64"))
+            _caches[backend_name] = SpeechCache(os.path.join(base, backend_name), max_mb * 1024 * 1024)
+        return _caches[backend_name]
\ No newline at end of file
@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class WarmState:
+    """Settings kept between runs (noise threshold, voice, name) so restarts are warm
+
+    With path=None the settings only live in memory, e.g. for server sessions.
+    """
+
+    def __init__(self, path="nexa_state.json"):
+        self.path = path
+        self.values = {}
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.values = json.load(f)
+        except (OSError, ValueError):
+            self.values = {}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def save(self, **values):
+        """Update some settings and write the snapshot atomically"""
+        with self.lock:
+            self.values.update(values)
+            if self.path is None:
+                return
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.values, f)
+            os.replace(temp_path, self.path)
+
+
+class StartupTasks:
+    """Independent startup jobs run side by side in background threads
+
+    Each job is named; wait(name) blocks until that one is done and returns
+    its result (or raises its error), so callers only wait for what they
+    actually need next.
+    """
+
+    def __init__(self, workers=4):
+        self.started = time.perf_counter()
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="nexa-startup")
+        self.futures = {}
+        self.timings = {}
+
+    def _timed(self, name, func, args):
+        try:
+            return func(*args)
+        finally:
+            self.timings[name] = time.perf_counter() - self.started
+
+    def launch(self, name, func, *args):
+        self.futures[name] = self.executor.submit(self._timed, name, func, args)
+        return self.futures[name]
+
+    def wait(self, name, timeout=None):
+        future = self.futures.get(name)
+        if future is None:
+            return None
+        return future.result(timeout)
+
+    def wait_all(self, timeout=None):
+        for name in list(self.futures):
+            try:
+                self.wait(name, timeout)
+            except Exception as e:
+                print(f"⚠️ Startup task '{name}' failed: {e}")
+        return dict(self.timings)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
\ No newline at end of file
@@ -0,0 +1,106 @@
+import argparse
+import glob
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs in a fresh interpreter so import time is part of the measurement
+PROBE = """
+import time
+started = time.perf_counter()
+from nexa_real_voice_311 import NEXA_Real_Voice
+imported = time.perf_counter()
+nexa = NEXA_Real_Voice()
+nexa.wait_until_ready()
+opened = time.perf_counter()
+# Without a saved threshold, capture runs on the default until the tracker has heard the room
+noise = nexa.audio_capture.noise
+if nexa.state.get("energy_threshold") is None and noise is not None:
+    while noise.floor is None:
+        time.sleep(0.005)
+ready = time.perf_counter()
+timings = nexa.startup.wait_all()
+# What a real session leaves behind for the next start
+nexa.remember_noise_level()
+print("RESULT " + json.dumps({
+    "import": imported - started,
+    "microphone": opened - started,
+    "ready": ready - started,
+    "all_tasks": time.perf_counter() - started,
+    "tasks": timings,
+}))
+"""
+
+
+def install(work_dir):
+    """Fresh copy of NEXA in work_dir: no bytecode, no compiled pack, no saved state"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    app_dir = os.path.join(work_dir, "app")
+    os.makedirs(app_dir)
+    for path in glob.glob(os.path.join(here, "nexa_*.py")) + [os.path.join(here, "nexa_pack.json")]:
+        shutil.copy(path, app_dir)
+    return app_dir
+
+
+def measure(work_dir, app_dir):
+    """Start the NEXA in app_dir once, from work_dir, and return its startup timings"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = app_dir + os.pathsep + env.get("PYTHONPATH", "")
+    env.pop("NEXA_PACK", None)
+    env.setdefault("NEXA_AUDIO_SOURCE", "synthetic")
+    env.setdefault("NEXA_TTS_BACKEND", "wav")
+    env.setdefault("NEXA_SPEECH_CACHE_DIR", os.path.join(work_dir, "speech_cache"))
+    if "NEXA_RECOGNIZER" not in env:
+        transcript = os.path.join(work_dir, "transcript.txt")
+        with open(transcript, "w", encoding="utf-8") as f:
+            f.write("hello\n")
+        env["NEXA_RECOGNIZER"] = "local:" + transcript
+    output = subprocess.run(
+        [sys.executable, "-c", "import json\n" + PROBE],
+        cwd=work_dir, env=env, capture_output=True, text=True, encoding="utf-8", timeout=60,
+    )
+    for line in output.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[7:])
+    raise RuntimeError(f"startup probe failed:\n{output.stdout}\n{output.stderr}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure NEXA cold and warm start times")
+    parser.add_argument("--runs", type=int, default=5, help="warm starts to time")
+    parser.add_argument("--budget", type=float, default=0.5,
+                        help="fail if the median warm time-to-ready exceeds this many seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="nexa_startup_") as work_dir:
+        # The first start compiles everything and learns the room; the rest reuse that
+        app_dir = install(work_dir)
+        cold = measure(work_dir, app_dir)
+        warm = [measure(work_dir, app_dir) for _ in range(args.runs)]
+
+    warm_ready = statistics.median(run["ready"] for run in warm)
+    warm_import = statistics.median(run["import"] for run in warm)
+    print(f"❄️ Cold start: ready in {cold['ready']:.3f}s "
+          f"(imports {cold['import']:.3f}s, microphone {cold['microphone']:.3f}s)")
+    print(f"🔥 Warm start: ready in {warm_ready:.3f}s (imports {warm_import:.3f}s) median over {args.runs} runs")
+    for name, seconds in sorted(cold["tasks"].items()):
+        print(f"   • {name}: {seconds:.3f}s cold")
+    failed = False
+    if warm_ready >= cold["ready"]:
+        print("❌ Warm start is no faster than the cold start")
+        failed = True
+    if warm_ready > args.budget:
+        print(f"❌ Warm start is over the {args.budget:.2f}s budget")
+        failed = True
+    if failed:
+        return 1
+    print(f"✅ Warm start is {cold['ready'] - warm_ready:.3f}s faster than cold and within the {args.budget:.2f}s budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
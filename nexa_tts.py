@@ -0,0 +1,545 @@
+import subprocess
+import tempfile
+import time
+import re
+import threading
+import queue
+import atexit
+import array
+import math
+import wave
+import os
+from nexa_speech_cache import get_speech_cache
+from nexa_metrics import METRICS
+
+# Long-lived SAPI script: one SpVoice for the whole session, one request per
+# stdin line, answered with "done" when finished:
+#   say|voice|rate|text            speak straight to the speakers
+#   render|voice|rate|path|text    synthesize into a WAV file
+#   play|path                      play a WAV file rendered earlier
+#   queue|path                     start or append a WAV file without waiting
+#   wait|                          wait until everything queued has played
+# Queued files go into SAPI's own output queue, so they play back to back.
+# Playback stops early when the "<script>.stop" flag file appears (barge-in)
+SAPI_WORKER_SCRIPT = '''
+On Error Resume Next
+Dim speech, voices, defaultVoice, current, line, parts, stream, fso, stopFile, queued
+Set speech = CreateObject("SAPI.SpVoice")
+Set fso = CreateObject("Scripting.FileSystemObject")
+Set queued = CreateObject("Scripting.Dictionary")
+stopFile = WScript.ScriptFullName & ".stop"
+Set voices = speech.GetVoices
+Set defaultVoice = speech.Voice
+current = "-"
+
+Sub SelectVoice(name)
+    Dim voice
+    If name = "" Then
+        Set speech.Voice = defaultVoice
+    ElseIf name = "female" Then
+        For Each voice in voices
+            If InStr(voice.GetDescription, "Female") > 0 Or _
+               InStr(voice.GetDescription, "Zira") > 0 Or _
+               InStr(voice.GetDescription, "David") = 0 Then
+                Set speech.Voice = voice
+                Exit For
+            End If
+        Next
+    ElseIf voices.Count > CInt(name) Then
+        Set speech.Voice = voices.Item(CInt(name))
+    End If
+End Sub
+
+Sub UseVoice(name, rate)
+    If name <> current Then
+        current = name
+        SelectVoice current
+    End If
+    speech.Rate = CInt(rate)
+End Sub
+
+Sub CheckStop()
+    If fso.FileExists(stopFile) Then
+        speech.Speak "", 2
+        fso.DeleteFile stopFile
+    End If
+End Sub
+
+Do While Not WScript.StdIn.AtEndOfStream
+    line = WScript.StdIn.ReadLine
+    parts = Split(line, "|", 2)
+    If UBound(parts) = 1 Then
+        If parts(0) = "say" Then
+            parts = Split(parts(1), "|", 3)
+            UseVoice parts(0), parts(1)
+            speech.Speak parts(2)
+        ElseIf parts(0) = "render" Then
+            parts = Split(parts(1), "|", 4)
+            UseVoice parts(0), parts(1)
+            Set stream = CreateObject("SAPI.SpFileStream")
+            stream.Format.Type = 22
+            stream.Open parts(2), 3
+            Set speech.AudioOutputStream = stream
+            speech.Speak parts(3)
+            stream.Close
+            Set speech.AudioOutputStream = Nothing
+        ElseIf parts(0) = "play" Then
+            Set stream = CreateObject("SAPI.SpFileStream")
+            stream.Open parts(1)
+            speech.SpeakStream stream, 1
+            Do Until speech.WaitUntilDone(50)
+                CheckStop
+            Loop
+            stream.Close
+        ElseIf parts(0) = "queue" Then
+            CheckStop
+            Set stream = CreateObject("SAPI.SpFileStream")
+            stream.Open parts(1)
+            queued.Add queued.Count, stream
+            speech.SpeakStream stream, 1
+        ElseIf parts(0) = "wait" Then
+            Do Until speech.WaitUntilDone(50)
+                CheckStop
+            Loop
+            For Each stream In queued.Items
+                stream.Close
+            Next
+            queued.RemoveAll
+        End If
+    End If
+    WScript.StdOut.WriteLine "done"
+Loop
+'''
+
+
+class SapiBackend:
+    """Windows SAPI voice kept alive in a single cscript process"""
+
+    def __init__(self):
+        self.process = None
+        self.script_file = None
+
+    def clone(self):
+        """A second, independent instance configured like this one"""
+        return SapiBackend()
+
+    def start(self):
+        if self.process and self.process.poll() is None:
+            return
+        if not self.script_file:
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.vbs', delete=False) as f:
+                f.write(SAPI_WORKER_SCRIPT)
+                self.script_file = f.name
+        self.process = subprocess.Popen(
+            ['cscript', '//Nologo', self.script_file],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            text=True, errors='replace', bufsize=1
+        )
+
+    def request(self, *fields):
+        self.start()
+        line = "|".join(str(field).replace("\r", " ").replace("\n", " ") for field in fields)
+        self.process.stdin.write(line + "\n")
+        self.process.stdin.flush()
+        if not self.process.stdout.readline():
+            raise RuntimeError("SAPI worker stopped")
+
+    def speak(self, text, voice=None, rate=0):
+        self.request("say", "" if voice is None else voice, int(rate), text)
+
+    def render(self, text, voice, rate, path):
+        self.request("render", "" if voice is None else voice, int(rate), path, text)
+
+    def play(self, path):
+        self.clear_stop()
+        self.request("play", path)
+
+    def queue(self, path, first=False):
+        if first:
+            self.clear_stop()
+        self.request("queue", path)
+
+    def wait(self):
+        self.request("wait", "")
+
+    def stop(self):
+        """Cut the current playback short"""
+        if self.script_file:
+            open(self.script_file + ".stop", "w").close()
+
+    def clear_stop(self):
+        if self.script_file and os.path.exists(self.script_file + ".stop"):
+            os.unlink(self.script_file + ".stop")
+
+    def close(self):
+        if self.process:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except Exception:
+                self.process.kill()
+            self.process = None
+        if self.script_file:
+            try:
+                self.clear_stop()
+                os.unlink(self.script_file)
+            except OSError:
+                pass
+            self.script_file = None
+
+
+class WaveFileBackend:
+    """Linux stand-in that renders each utterance to a WAV file instead of speaking
+
+    speak() renders into one scratch file per instance, overwritten every
+    time and deleted on close(), so long sessions do not fill the disk.
+    """
+
+    sample_rate = 16000
+
+    def __init__(self, output_dir=None, realtime=None):
+        self.output_dir = output_dir or os.path.join(tempfile.gettempdir(), "nexa_tts")
+        # Realtime playback takes as long as the clip, so barge-in can be tried headless
+        if realtime is None:
+            realtime = os.environ.get("NEXA_TTS_REALTIME") == "1"
+        self.realtime = realtime
+        self.stopped = threading.Event()
+        self.count = 0
+        self.last_file = None
+        self.scratch = None
+        self.queued = []
+
+    def clone(self):
+        """A second, independent instance configured like this one"""
+        return WaveFileBackend(self.output_dir, self.realtime)
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def synthesize(self, text, voice=None, rate=0):
+        """Tone per word, pitch from the voice and length from the rate"""
+        pitch = 180.0 + 40.0 * (voice if isinstance(voice, int) else 1)
+        word_seconds = 0.3 * (1.0 - 0.05 * rate)
+        samples = array.array('h')
+        gap = [0] * int(self.sample_rate * 0.05)
+        for word in text.split():
+            length = int(self.sample_rate * word_seconds * min(len(word), 8) / 5)
+            step = 2 * math.pi * pitch / self.sample_rate
+            samples.extend(int(6000 * math.sin(step * i)) for i in range(length))
+            samples.extend(gap)
+        return samples.tobytes()
+
+    def render(self, text, voice, rate, path):
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(self.synthesize(text, voice, rate))
+
+    def speak(self, text, voice=None, rate=0):
+        self.start()
+        self.count += 1
+        if self.scratch is None:
+            fd, self.scratch = tempfile.mkstemp(prefix="utterance-", suffix=".wav", dir=self.output_dir)
+            os.close(fd)
+        self.render(text, voice, rate, self.scratch)
+        self.last_file = self.scratch
+
+    def play(self, path):
+        # No audio device here, so playing just records what would be heard
+        self.last_file = path
+        self.stopped.clear()
+        if self.realtime:
+            with wave.open(path, 'rb') as f:
+                seconds = f.getnframes() / f.getframerate()
+            self.stopped.wait(seconds)
+
+    def queue(self, path, first=False):
+        if first:
+            self.stopped.clear()
+        self.queued.append(path)
+        self.last_file = path
+
+    def wait(self):
+        """Play everything queued as one continuous clip"""
+        paths, self.queued = self.queued, []
+        if self.realtime:
+            seconds = 0.0
+            for path in paths:
+                with wave.open(path, 'rb') as f:
+                    seconds += f.getnframes() / f.getframerate()
+            self.stopped.wait(seconds)
+
+    def stop(self):
+        self.stopped.set()
+
+    def close(self):
+        if self.scratch:
+            try:
+                os.unlink(self.scratch)
+            except OSError:
+                pass
+            self.scratch = None
+
+
+class NullBackend:
+    """Speech sink for benchmarks: accepts everything, renders silence, plays nothing"""
+
+    def __init__(self):
+        self.count = 0
+        self.last_text = None
+
+    def clone(self):
+        return NullBackend()
+
+    def start(self):
+        pass
+
+    def render(self, text, voice, rate, path):
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(16000)
+        self.last_text = text
+
+    def speak(self, text, voice=None, rate=0):
+        self.count += 1
+        self.last_text = text
+
+    def play(self, path):
+        pass
+
+    def queue(self, path, first=False):
+        pass
+
+    def wait(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+BACKENDS = {
+    "sapi": SapiBackend,
+    "wav": WaveFileBackend,
+    "null": NullBackend,
+}
+
+
+def default_backend_name():
+    """SAPI on Windows, WAV rendering everywhere else, NEXA_TTS_BACKEND overrides"""
+    return os.environ.get("NEXA_TTS_BACKEND") or ("sapi" if os.name == "nt" else "wav")
+
+
+# A sentence ends at . ! ? (maybe followed by a closing quote or bracket)
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|(?<=[.!?][\"')\]])\s+")
+# Long sentences may also break after , ; : or at a spaced dash
+CLAUSE_END = re.compile(r"(?<=[,;:])\s+|\s+(?=[-\u2013\u2014]\s)")
+
+
+def split_sentences(text, max_chars=80):
+    """Break a reply into sentences, and long sentences into clauses, for streaming"""
+    chunks = []
+    for sentence in SENTENCE_END.split(text.strip()):
+        current = ""
+        for part in CLAUSE_END.split(sentence) if len(sentence) > max_chars else [sentence]:
+            if current and len(current) + 1 + len(part) > max_chars:
+                chunks.append(current)
+                current = part
+            else:
+                current = f"{current} {part}" if current else part
+        if not current:
+            continue
+        # Stray punctuation is not worth a chunk of its own
+        if chunks and not any(c.isalnum() for c in current):
+            chunks[-1] += " " + current
+        else:
+            chunks.append(current)
+    return chunks
+
+
+def streaming_enabled():
+    """Replies are spoken sentence by sentence unless NEXA_TTS_STREAM=0"""
+    return os.environ.get("NEXA_TTS_STREAM", "1") != "0"
+
+
+class SpeechJob:
+    def __init__(self, text, voice, rate, stream=False):
+        self.text = text
+        self.voice = voice
+        self.rate = rate
+        self.stream = stream
+        self.done = threading.Event()
+        self.error = None
+
+
+class SpeechWorker:
+    """One synthesis thread per process, fed utterances through a queue
+
+    Rendering and playback use separate backend instances (the player is a
+    clone() of the backend unless one is given), so the next reply can be
+    synthesized while the current one is still playing. Streamed
+    replies use the same split within one reply: its first sentence starts
+    playing while the rest are still being rendered, and each rendered
+    sentence is appended to the player's queue so there is no gap between them.
+    """
+
+    def __init__(self, backend, cache=None, player=None):
+        self.backend = backend
+        self.player = player or backend.clone()
+        self.cache = cache
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.last_error = None
+        self.render_lock = threading.Lock()
+        self.play_lock = threading.Lock()
+        self.start_lock = threading.Lock()
+        self.temporary = set()
+        self.streaming = streaming_enabled()
+        self.interrupted = threading.Event()
+
+    def start(self):
+        # Startup warms the worker up in the background while callers may already say()
+        with self.start_lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.backend.start()
+            self.player.start()
+            self.thread = threading.Thread(target=self._run, name="nexa-tts", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            try:
+                if job.stream:
+                    self.stream(job.text, job.voice, job.rate)
+                elif self.cache:
+                    self.play(self.render(job.text, job.voice, job.rate))
+                else:
+                    with self.render_lock:
+                        self.backend.speak(job.text, job.voice, job.rate)
+            except Exception as e:
+                job.error = e
+            job.done.set()
+
+    def render(self, text, voice=None, rate=0):
+        """Synthesize to a WAV file and return its path, from the cache when possible"""
+        with self.render_lock:
+            if self.cache:
+                return self.cache.fetch(self.backend, text, voice, rate)
+            fd, path = tempfile.mkstemp(suffix='.wav')
+            os.close(fd)
+            self.backend.render(text, voice, rate, path)
+            self.temporary.add(path)
+            return path
+
+    def play(self, path):
+        """Play a rendered file; blocks until it finishes or stop() is called"""
+        with self.play_lock:
+            try:
+                self.player.play(path)
+            finally:
+                if path in self.temporary:
+                    self.temporary.discard(path)
+                    os.unlink(path)
+
+    def stream(self, text, voice=None, rate=0):
+        """Play a reply sentence by sentence while the later sentences render"""
+        chunks = split_sentences(text)
+        if len(chunks) <= 1:
+            self.play(self.render(text, voice, rate))
+            return
+        self.interrupted.clear()
+        rendered = queue.Queue()
+
+        def render_all():
+            try:
+                for chunk in chunks:
+                    if self.interrupted.is_set():
+                        break
+                    rendered.put(self.render(chunk, voice, rate))
+            except Exception as e:
+                rendered.put(e)
+            rendered.put(None)
+
+        start = time.perf_counter()
+        threading.Thread(target=render_all, name="nexa-tts-render", daemon=True).start()
+        played = []
+        error = None
+        with self.play_lock:
+            try:
+                while True:
+                    path = rendered.get()
+                    if path is None:
+                        break
+                    if isinstance(path, Exception):
+                        error = path
+                        continue
+                    played.append(path)
+                    if self.interrupted.is_set():
+                        continue
+                    self.player.queue(path, first=len(played) == 1)
+                    if len(played) == 1:
+                        METRICS.observe("tts_first_audio", time.perf_counter() - start)
+                self.player.wait()
+            finally:
+                for path in played:
+                    if path in self.temporary:
+                        self.temporary.discard(path)
+                        os.unlink(path)
+        if error:
+            raise error
+
+    def stop(self):
+        """Barge-in: cut the reply that is playing right now"""
+        self.interrupted.set()
+        self.player.stop()
+
+    def say(self, text, voice=None, rate=0, wait=True, timeout=20, stream=None):
+        """Queue an utterance; returns False if it failed or did not finish in time
+
+        stream=True speaks it sentence by sentence (see stream()); the default
+        comes from NEXA_TTS_STREAM.
+        """
+        self.start()
+        job = SpeechJob(text, voice, rate, self.streaming if stream is None else stream)
+        self.jobs.put(job)
+        if not wait:
+            return True
+        if not job.done.wait(timeout):
+            self.last_error = "timed out"
+            METRICS.count("tts_timeouts")
+            return False
+        if job.error:
+            self.last_error = str(job.error)
+            METRICS.count("tts_failures")
+            return False
+        return True
+
+    def close(self):
+        if self.thread and self.thread.is_alive():
+            self.jobs.put(None)
+            self.thread.join(timeout=5)
+        self.backend.close()
+        self.player.close()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_speech_worker():
+    """Shared speech worker, created on first use"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            name = default_backend_name()
+            _worker = SpeechWorker(BACKENDS[name](), get_speech_cache(name))
+            atexit.register(_worker.close)
+        return _worker
\ No newline at end of file
@@ -0,0 +1,115 @@
+import numpy as np
+
+
+class VoiceActivityDetector:
+    """Speech/non-speech decisions for 16-bit PCM, computed in bulk with NumPy
+
+    Audio is cut into short analysis frames (10 ms by default) and every
+    frame gets an RMS energy and a zero-crossing rate in one vectorised
+    pass. A frame is speech when it is louder than the energy threshold, or
+    louder than 0.6 of it (fricative_ratio) with the high zero-crossing rate
+    of fricatives such as "s" and "f", which plain energy gating clips off
+    word edges. Any lower and hiss, which crosses zero just as often, gets
+    in as fricatives while the threshold is still catching up with it.
+    """
+
+    def __init__(self, sample_rate, frame_ms=10, fricative_ratio=0.6, fricative_zcr=0.3, lead=0.1, trail=0.15):
+        self.sample_rate = sample_rate
+        self.frame_length = max(2, int(sample_rate * frame_ms / 1000))
+        self.frame_seconds = self.frame_length / sample_rate
+        self.fricative_ratio = fricative_ratio
+        self.fricative_zcr = fricative_zcr
+        self.lead = lead
+        self.trail = trail
+
+    @staticmethod
+    def level(data):
+        """Root-mean-square level of 16-bit PCM"""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        if not len(samples):
+            return 0.0
+        return float(np.sqrt(np.mean(samples * samples)))
+
+    def frames(self, data):
+        """Whole analysis frames of data as a (count, frame_length) float array"""
+        samples = np.frombuffer(data, dtype=np.int16)
+        count = len(samples) // self.frame_length
+        return samples[:count * self.frame_length].reshape(count, self.frame_length).astype(np.float32)
+
+    def features(self, data):
+        """(energy, zero-crossing rate) arrays with one entry per analysis frame"""
+        frames = self.frames(data)
+        energy = np.sqrt(np.mean(frames * frames, axis=1)) if len(frames) else np.zeros(0, np.float32)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_length - 1)
+        return energy, zcr
+
+    def speech_mask(self, data, threshold):
+        """Boolean array: which analysis frames of data hold speech"""
+        energy, zcr = self.features(data)
+        fricative = (energy > threshold * self.fricative_ratio) & (zcr > self.fricative_zcr)
+        return (energy > threshold) | fricative
+
+    def trailing_silence(self, mask):
+        """Seconds after the last speech frame in a mask (all of it if there is none)"""
+        hits = np.flatnonzero(mask)
+        last = hits[-1] if len(hits) else -1
+        return (len(mask) - 1 - last) * self.frame_seconds
+
+    def trim(self, data, threshold):
+        """Byte range of data without its leading and trailing silence
+
+        lead and trail seconds of padding are kept around the speech so
+        onsets and word endings reach the recognizer intact. Audio with no
+        speech frames at all is left as it is.
+        """
+        mask = self.speech_mask(data, threshold)
+        hits = np.flatnonzero(mask)
+        if not len(hits):
+            return 0, len(data)
+        first = max(0, int(hits[0]) - int(self.lead / self.frame_seconds))
+        last = int(hits[-1]) + 1 + int(self.trail / self.frame_seconds)
+        frame_bytes = self.frame_length * 2
+        return first * frame_bytes, min(len(data), last * frame_bytes)
+
+
+class NoiseTracker:
+    """Running noise-floor estimate taken from the quietest recent frames
+
+    Keeps the energies of the last window seconds of analysis frames. The
+    noise floor is a low percentile of them: speech always has gaps, so it
+    hardly moves the estimate, while a room that gets louder or quieter
+    moves it both ways. The floor is smoothed so one slammed door does not
+    swing the threshold, which is ratio times the floor: about 10 dB, enough
+    that even the fricative test (a fraction of the threshold) stays clear
+    of steady noise. It is fed every frame, not only those the VAD called
+    silence: once a room got louder than the threshold, every frame would
+    count as speech and the estimate could never catch up.
+    """
+
+    def __init__(self, frame_seconds, window=3.0, percentile=10, ratio=3.0, minimum=50.0, smoothing=0.1, warmup=0.5):
+        self.size = max(1, int(window / frame_seconds))
+        self.warmup_frames = max(1, int(warmup / frame_seconds))
+        self.energies = np.zeros(self.size, np.float32)
+        self.count = 0
+        self.percentile = percentile
+        self.ratio = ratio
+        self.minimum = minimum
+        self.smoothing = smoothing
+        self.floor = None
+
+    def update(self, energy):
+        """Add frame energies; returns the new threshold, or None while still warming up"""
+        energy = energy[-self.size:]
+        position = self.count % self.size
+        first = min(len(energy), self.size - position)
+        self.energies[position:position + first] = energy[:first]
+        self.energies[:len(energy) - first] = energy[first:]
+        self.count += len(energy)
+        filled = min(self.count, self.size)
+        if filled < self.warmup_frames:
+            return None
+        rank = filled * self.percentile // 100
+        floor = float(np.partition(self.energies[:filled], rank)[rank])
+        self.floor = floor if self.floor is None else self.floor + self.smoothing * (floor - self.floor)
+        return max(self.minimum, self.ratio * self.floor)
\ No newline at end of file
@@ -2,64 +2,36 @@ import subprocess
 import tempfile
 import os
 from datetime import datetime, timedelta
-import random
 import time
-import json
+from nexa_intents import CATALOG, VOICE_INPUT_MATCHER
+from nexa_tts import get_speech_worker
+from nexa_normalizer import PRONUNCIATION
+from nexa_journal import JournalStore
+from nexa_scheduler import ReminderScheduler, next_time_of_day
 
 class NEXA_Voice_Input:
     def __init__(self):
         print("🔊 Initializing NEXA with Voice Input...")
         self.voice_index = 1
-        self.reminders = []
-        self.alarms = []
+        self.reminders = {}
+        self.alarms = {}
         self.load_data()
+        self.scheduler = ReminderScheduler(self.deliver_due)
+        self.schedule_pending()
+        self.scheduler.start()
         
     def load_data(self):
         """Load NEXA data"""
-        try:
-            with open("nexa_data.json", "r") as f:
-                data = json.load(f)
-                self.reminders = data.get("reminders", [])
-                self.alarms = data.get("alarms", [])
-        except:
-            pass
-    
-    def save_data(self):
-        """Save NEXA data"""
-        data = {
-            "reminders": self.reminders,
-            "alarms": self.alarms
-        }
-        with open("nexa_data.json", "w") as f:
-            json.dump(data, f, indent=2)
+        self.store = JournalStore("nexa_data")
+        self.reminders = self.store.table("reminders")
+        self.alarms = self.store.table("alarms")
     
     def speak(self, text):
         """NEXA speaking"""
-        text = text.replace("NEXA", "NEX-uh")
+        text = PRONUNCIATION.normalize(text)
         print(f"🤖 NEXA: {text}")
         
-        vb_script = f'''
-Dim speech
-Set speech = CreateObject("SAPI.SpVoice")
-If speech.GetVoices.Count > {self.voice_index} Then
-    Set speech.Voice = speech.GetVoices.Item({self.voice_index})
-End If
-speech.Speak "{text.replace('"', "'")}"
-'''
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.vbs', delete=False) as f:
-            f.write(vb_script)
-            temp_file = f.name
-        
-        try:
-            subprocess.run(['cscript', '//B', '//Nologo', temp_file], timeout=20)
-        except:
-            pass
-        finally:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+        get_speech_worker().say(text, self.voice_index)
     
     def listen_with_windows_speech(self):
         """Use Windows built-in speech recognition"""
@@ -116,25 +88,56 @@ WScript.Echo "Processing complete"
         command = input("📝 Your voice command: ").strip().lower()
         return command
     
-    def set_reminder(self, reminder_text, time_str):
+    def schedule_pending(self):
+        """Hand every reminder and alarm that has not fired yet to the scheduler"""
+        pending = []
+        for record_id, reminder in self.reminders.items():
+            if reminder.get("due") and not reminder.get("done"):
+                pending.append((("reminders", record_id), reminder["due"]))
+        for record_id, alarm in self.alarms.items():
+            if alarm.get("due") and alarm.get("active"):
+                pending.append((("alarms", record_id), alarm["due"]))
+        self.scheduler.schedule_many(pending)
+    
+    def deliver_due(self, key, seconds_late):
+        """Scheduler callback: say the reminder or ring the alarm"""
+        table, record_id = key
+        record = self.store.table(table).get(record_id)
+        if not record:
+            return
+        missed = "While I was offline: " if seconds_late > 60 else ""
+        if table == "reminders":
+            self.store.update("reminders", record_id, done=True)
+            self.speak(f"{missed}Reminder - {record['text']}")
+        else:
+            self.store.update("alarms", record_id, active=False)
+            self.speak(f"{missed}Alarm! It's {record['time']}.")
+    
+    def set_reminder(self, reminder_text, time_str, due=None):
         """Set a reminder"""
         reminder = {
             "text": reminder_text,
             "time": time_str,
             "created": datetime.now().isoformat()
         }
-        self.reminders.append(reminder)
-        self.save_data()
+        if due:
+            reminder["due"] = due.timestamp()
+        record_id = self.store.add("reminders", reminder)
+        if due:
+            self.scheduler.schedule(("reminders", record_id), reminder["due"])
         return f"I'll remind you: '{reminder_text}' at {time_str}"
     
-    def set_alarm(self, alarm_time):
+    def set_alarm(self, alarm_time, due=None):
         """Set an alarm"""
         alarm = {
             "time": alarm_time,
             "active": True
         }
-        self.alarms.append(alarm)
-        self.save_data()
+        if due:
+            alarm["due"] = due.timestamp()
+        record_id = self.store.add("alarms", alarm)
+        if due:
+            self.scheduler.schedule(("alarms", record_id), alarm["due"])
         return f"Alarm set for {alarm_time}"
     
     def process_command(self, command):
@@ -142,36 +145,34 @@ WScript.Echo "Processing complete"
         if not command:
             return "I didn't catch that. Please try again."
         
-        if any(word in command for word in ['hello', 'hi', 'hey', 'nexa']):
+        intent = VOICE_INPUT_MATCHER.match(command)
+        
+        if intent == "greeting":
             return "Hello! I'm listening to your voice commands now!"
         
-        elif any(word in command for word in ['reminder', 'remember']):
+        elif intent == "reminder":
             if 'tomorrow' in command:
-                time_str = (datetime.now() + timedelta(days=1)).strftime("%I:%M %p")
+                due = datetime.now() + timedelta(days=1)
+                time_str = due.strftime("%I:%M %p")
                 task = command.replace('reminder', '').replace('remember', '').replace('tomorrow', '').strip()
-                return self.set_reminder(task, time_str)
+                return self.set_reminder(task, time_str, due)
             return "What would you like me to remind you about?"
         
-        elif any(word in command for word in ['alarm', 'wake']):
+        elif intent == "alarm":
             if '5' in command and 'am' in command:
-                return self.set_alarm("5:00 AM")
+                return self.set_alarm("5:00 AM", next_time_of_day(5))
             return "What time for the alarm?"
         
-        elif 'time' in command:
+        elif intent == "time":
             return f"Time is {datetime.now().strftime('%I:%M %p')}"
         
-        elif 'date' in command:
+        elif intent == "date":
             return f"Today is {datetime.now().strftime('%A, %B %d, %Y')}"
         
-        elif 'joke' in command:
-            jokes = [
-                "Why do programmers prefer dark mode? Because light attracts bugs!",
-                "What's a computer's favorite snack? Microchips!",
-                "Why was the computer cold? It left its Windows open!"
-            ]
-            return random.choice(jokes)
+        elif intent == "joke":
+            return CATALOG.reply("voice_input.joke")
         
-        elif any(word in command for word in ['stop', 'exit', 'quit']):
+        elif intent == "stop":
             return "stop"
         
         else:
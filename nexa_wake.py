@@ -0,0 +1,271 @@
+import os
+import queue
+import sys
+import threading
+import time
+import numpy as np
+from nexa_capture import Utterance
+from nexa_metrics import METRICS
+
+TEMPLATES_PATH = os.environ.get("NEXA_WAKE_TEMPLATES", "nexa_wake.npz")
+
+
+def wake_word_enabled():
+    """Recognition waits for "Nexa" only when NEXA_WAKE=1"""
+    return os.environ.get("NEXA_WAKE", "0") == "1"
+
+
+def mel_filterbank(sample_rate, n_fft, n_filters, low=100.0, high=6000.0):
+    """Triangular mel filters as an (n_filters, n_fft // 2 + 1) matrix"""
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+    mels = np.linspace(to_mel(low), to_mel(min(high, sample_rate / 2)), n_filters + 2)
+    bins = np.floor((n_fft + 1) * 700.0 * (10 ** (mels / 2595.0) - 1) / sample_rate).astype(int)
+    bank = np.zeros((n_filters, n_fft // 2 + 1), np.float32)
+    for i in range(n_filters):
+        left, center, right = bins[i], bins[i + 1], bins[i + 2]
+        if center > left:
+            bank[i, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[i, center:right] = (right - np.arange(center, right)) / (right - center)
+    return bank
+
+
+class WakeWordSpotter:
+    """Template-matching keyword spotter for "Nexa" / "hey Nexa"
+
+    A few recordings of the wake word (see enroll()) are the templates.
+    Audio becomes 20 log-mel energies per 10 ms, mean-normalised and scaled
+    to unit length, and each template is aligned against the start of a
+    phrase with dynamic time warping. Each template frame may consume 0, 1
+    or 2 frames of audio, so every row of the alignment depends only on the
+    row before it and is one vectorised NumPy step. The score is the mean
+    cosine distance along the best path: 0 is identical, about 1 unrelated.
+    """
+
+    def __init__(self, templates, sample_rate=16000, threshold=0.35, search_seconds=2.0, stay_penalty=0.1, n_filters=20):
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.search_seconds = search_seconds
+        self.stay_penalty = stay_penalty
+        self.window = int(0.025 * sample_rate)
+        self.hop = int(0.010 * sample_rate)
+        self.n_fft = 1 << (self.window - 1).bit_length()
+        self.taper = np.hamming(self.window).astype(np.float32)
+        self.bank = mel_filterbank(sample_rate, self.n_fft, n_filters)
+        self.templates = [self.features(audio) for audio in templates]
+        self.templates = [t for t in self.templates if len(t)]
+        if not self.templates:
+            raise ValueError("no usable wake-word templates")
+        # The wake word has to start within the first half second of a phrase
+        self.start_frames = int(0.5 * sample_rate / self.hop)
+
+    @classmethod
+    def load(cls, path=TEMPLATES_PATH, **options):
+        """Spotter from enrolled templates, or None if there are none yet"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as archive:
+            sample_rate = int(archive["sample_rate"])
+            templates = [archive[name].tobytes() for name in sorted(archive.files) if name.startswith("t")]
+        return cls(templates, sample_rate, **options)
+
+    def features(self, data):
+        """(frames, filters) unit-length log-mel vectors for 16-bit PCM"""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        if len(samples) < self.window:
+            return np.zeros((0, len(self.bank)), np.float32)
+        count = 1 + (len(samples) - self.window) // self.hop
+        index = np.arange(self.window)[None, :] + self.hop * np.arange(count)[:, None]
+        spectrum = np.abs(np.fft.rfft(samples[index] * self.taper, self.n_fft)) ** 2
+        energies = np.log(spectrum @ self.bank.T + 1.0)
+        energies -= energies.mean(axis=0)
+        energies /= np.maximum(np.linalg.norm(energies, axis=1, keepdims=True), 1e-6)
+        return energies.astype(np.float32)
+
+    def align(self, template, audio):
+        """(mean path cost, last audio frame) of the best match starting near the front"""
+        cost = 1.0 - template @ audio.T
+        total = cost[0].copy()
+        total[self.start_frames:] = np.inf
+        blocked = np.full(2, np.inf, np.float32)
+        for row in cost[1:]:
+            one = np.concatenate((blocked[:1], total[:-1]))
+            two = np.concatenate((blocked, total[:-2]))
+            total = row + np.minimum(np.minimum(total + self.stay_penalty, one), two)
+        end = int(np.argmin(total))
+        return float(total[end]) / len(template), end
+
+    def spot(self, data):
+        """(score, byte offset where the wake word ends) if data starts with it, else None"""
+        audio = self.features(data[:int(self.search_seconds * self.sample_rate) * 2])
+        best = None
+        for template in self.templates:
+            if len(audio) < len(template) // 2:
+                continue
+            score, end = self.align(template, audio)
+            if best is None or score < best[0]:
+                best = (score, end)
+        if best is None or best[0] > self.threshold:
+            return None
+        return best[0], min(len(data), (best[1] * self.hop + self.window) * 2)
+
+
+class WakeGate:
+    """Background listener that only lets phrases through after "Nexa"
+
+    The gate owns the capture stream: its thread cuts every phrase, runs the
+    spotter on it and drops it unless it starts with the wake word. Whatever
+    follows the wake word in the same breath ("Nexa, what time is it") is
+    passed on straight away; a bare "Nexa" opens the gate for the next
+    phrase within awake_seconds. Spotting is skipped while it has used more
+    than cpu_budget seconds of CPU per second of audio heard (a fraction of
+    one core on a live microphone), so a noisy room can never make it a CPU
+    hog.
+    """
+
+    def __init__(self, capture, spotter, awake_seconds=8.0, cpu_budget=0.05, min_command=0.3, on_wake=None):
+        self.capture = capture
+        self.spotter = spotter
+        self.awake_seconds = awake_seconds
+        self.cpu_budget = cpu_budget
+        self.min_command = min_command
+        self.on_wake = on_wake
+        self.commands = queue.Queue()
+        self.awake_until = 0.0
+        self.wake_score = None
+        self.running = False
+        self.thread = None
+        self.first_frame = None
+        self.cpu_seconds = 0.0
+        self.phrases = 0
+        self.wakes = 0
+        self.rejected = 0
+        self.over_budget = 0
+        self.false_accepts = 0
+
+    def start(self):
+        self.running = True
+        self.first_frame = self.capture.now()
+        self.thread = threading.Thread(target=self._run, name="nexa-wake", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while self.running:
+            utterance = self.capture.next_utterance(timeout=1, phrase_time_limit=8)
+            if utterance is None:
+                if self.capture.exhausted():
+                    self.commands.put(None)
+                    return
+                continue
+            self.phrases += 1
+            if time.monotonic() < self.awake_until:
+                self.awake_until = 0.0
+                utterance.wake_score = self.wake_score
+                self.commands.put(utterance)
+                continue
+            self.check(utterance)
+
+    def audio_seconds(self):
+        if self.first_frame is None:
+            return 0.0
+        return (self.capture.cursor - self.first_frame) * self.capture.frame_seconds
+
+    def cpu_share(self):
+        """CPU seconds spent spotting per second of audio"""
+        heard = self.audio_seconds()
+        return self.cpu_seconds / heard if heard > 0 else 0.0
+
+    def check(self, utterance):
+        """Spot the wake word in one phrase and pass on what follows it"""
+        if self.cpu_share() > self.cpu_budget:
+            self.over_budget += 1
+            METRICS.count("wake_over_budget")
+            return
+        start = time.thread_time()
+        found = self.spotter.spot(utterance.frame_data)
+        self.cpu_seconds += time.thread_time() - start
+        if found is None:
+            self.rejected += 1
+            METRICS.count("wake_rejected")
+            return
+        score, end = found
+        self.wakes += 1
+        METRICS.count("wake_detected")
+        rest = utterance.frame_data[end:]
+        if len(rest) >= self.min_command * utterance.sample_rate * utterance.sample_width:
+            command = Utterance(rest, utterance.sample_rate, utterance.sample_width, utterance.start_frame, utterance.end_frame)
+            command.wake_score = score
+            self.commands.put(command)
+            return
+        self.awake_until = time.monotonic() + self.awake_seconds
+        self.wake_score = score
+        if self.on_wake:
+            self.on_wake(score)
+
+    def next_command(self, timeout=15):
+        """The next phrase meant for NEXA, or None on timeout"""
+        try:
+            return self.commands.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def false_accept(self):
+        """A woken phrase turned out not to be a command (nothing recognized)"""
+        self.false_accepts += 1
+        METRICS.count("wake_false_accepts")
+
+    def report(self):
+        return {
+            "phrases": self.phrases,
+            "wakes": self.wakes,
+            "rejected": self.rejected,
+            "over_budget": self.over_budget,
+            "false_accepts": self.false_accepts,
+            "cpu_seconds": self.cpu_seconds,
+            "audio_seconds": self.audio_seconds(),
+            "cpu_share": self.cpu_share(),
+        }
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+
+
+def open_wake_gate(capture, on_wake=None, path=TEMPLATES_PATH):
+    """Gate tuned by NEXA_WAKE_THRESHOLD and NEXA_WAKE_CPU, or None if nothing is enrolled"""
+    spotter = WakeWordSpotter.load(path, threshold=float(os.environ.get("NEXA_WAKE_THRESHOLD", "0.35")))
+    if spotter is None:
+        return None
+    return WakeGate(capture, spotter, cpu_budget=float(os.environ.get("NEXA_WAKE_CPU", "0.05")), on_wake=on_wake)
+
+
+def enroll(path=TEMPLATES_PATH, count=4):
+    """Record the wake word a few times from the microphone and save the templates"""
+    from nexa_capture import AudioCapture, open_audio_source
+    capture = AudioCapture(open_audio_source())
+    capture.start()
+    templates = []
+    try:
+        # Give the noise tracker a moment on the room before the first take
+        time.sleep(1)
+        while len(templates) < count:
+            phrase = "Nexa" if len(templates) % 2 == 0 else "Hey Nexa"
+            print(f"🎙️ Say \"{phrase}\" ({len(templates) + 1}/{count})")
+            utterance = capture.next_utterance(timeout=10, phrase_time_limit=3)
+            if utterance is None:
+                print("⏰ Didn't hear anything, let's try that again")
+                continue
+            templates.append(np.frombuffer(utterance.frame_data, dtype=np.int16))
+    finally:
+        capture.close()
+    np.savez(path, sample_rate=capture.sample_rate, **{f"t{i}": audio for i, audio in enumerate(templates)})
+    print(f"✅ Saved {len(templates)} wake-word samples to {path}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["enroll"]:
+        enroll()
+    else:
+        print("Usage: python nexa_wake.py enroll")
\ No newline at end of file